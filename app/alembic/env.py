@@ -7,7 +7,9 @@ from alembic import context
 
 from database import Base
 target_metadata = Base.metadata
-from models import User, ResumeData, InterviewReport
+from models import User, ResumeData, InterviewReport, AnalysisCacheEntry, ResumeFile, Skill, ResumeItem, \
+    AnalyticsPending, AnalyticsScoreBucket, AnalyticsDaily, AnalyticsSkillCount, \
+    ResumeFingerprint, ResumeLshBucket
 
 
 
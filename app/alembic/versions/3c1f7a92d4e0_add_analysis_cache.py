@@ -0,0 +1,42 @@
+"""Add analysis cache
+
+Revision ID: 3c1f7a92d4e0
+Revises: 89fa08de8b5a
+Create Date: 2026-10-17 09:12:04.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a92d4e0'
+down_revision: Union[str, None] = '89fa08de8b5a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analysis_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('prompt_version', sa.String(length=20), nullable=False),
+    sa.Column('result', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('last_accessed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analysis_cache_id'), 'analysis_cache', ['id'], unique=False)
+    op.create_index('ix_analysis_cache_hash_version', 'analysis_cache', ['content_hash', 'prompt_version'], unique=True)
+    op.create_index(op.f('ix_analysis_cache_last_accessed_at'), 'analysis_cache', ['last_accessed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_analysis_cache_last_accessed_at'), table_name='analysis_cache')
+    op.drop_index('ix_analysis_cache_hash_version', table_name='analysis_cache')
+    op.drop_index(op.f('ix_analysis_cache_id'), table_name='analysis_cache')
+    op.drop_table('analysis_cache')
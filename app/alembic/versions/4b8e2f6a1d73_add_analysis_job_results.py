@@ -0,0 +1,34 @@
+"""Add analysis job results
+
+Revision ID: 4b8e2f6a1d73
+Revises: 9e4b7c2d5f81
+Create Date: 2026-10-17 21:48:09.615274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2f6a1d73'
+down_revision: Union[str, None] = '9e4b7c2d5f81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('analysis_job_results',
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('result', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume_data.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analysis_job_results')
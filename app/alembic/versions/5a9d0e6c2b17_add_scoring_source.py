@@ -0,0 +1,28 @@
+"""Add scoring source to resume data
+
+Revision ID: 5a9d0e6c2b17
+Revises: b7e4d2a19f63
+Create Date: 2026-10-17 13:05:51.226740
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a9d0e6c2b17'
+down_revision: Union[str, None] = 'b7e4d2a19f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_data', sa.Column('scoring_source', sa.String(length=20), nullable=True, server_default='llm'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resume_data', 'scoring_source')
@@ -0,0 +1,117 @@
+"""Add resume fingerprints
+
+Revision ID: 9e4b7c2d5f81
+Revises: c58e1a4f7b29
+Create Date: 2026-10-17 19:26:41.302518
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7c2d5f81'
+down_revision: Union[str, None] = 'c58e1a4f7b29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_PAGE_SIZE = 1000
+
+# Frozen copies of dedup.normalize_email / normalize_phone as of this revision: the backfill must keep
+# producing the same identifiers even after the live normalisers change
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(value) -> Union[str, None]:
+    if not value:
+        return None
+    match = EMAIL_RE.search(str(value).lower())
+    if match is None:
+        return None
+    local, _, domain = match.group(0).strip(".").rpartition("@")
+    if domain in GMAIL_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"[:100] if local else None
+
+
+def normalize_phone(value) -> Union[str, None]:
+    digits = re.sub(r"\D", "", str(value or ""))
+    if len(digits) < 7 or len(set(digits)) == 1:
+        return None
+    return digits[-10:]
+
+
+def _backfill(resume_fingerprints):
+    # Existing resumes have no stored text, so they get identifiers only: later uploads can still
+    # match them by email or phone, while MinHash matching starts with the resumes ingested from now on
+    bind = op.get_bind()
+    resume_data = sa.table('resume_data', sa.column('id'), sa.column('candidate_gmail'), sa.column('candidate_phone'))
+    seen = {}  # normalized identifier -> (candidate_id, latest resume_id)
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(resume_data).where(resume_data.c.id > last_id).order_by(resume_data.c.id).limit(BACKFILL_PAGE_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        fingerprints = []
+        for row in rows:
+            email, phone = normalize_email(row.candidate_gmail), normalize_phone(row.candidate_phone)
+            keys = [("email", email), ("phone", phone)]
+            reason, match = next(((kind, seen[(kind, value)]) for kind, value in keys if (kind, value) in seen),
+                                 (None, None))
+            candidate_id = match[0] if match else row.id
+            for kind, value in keys:
+                if value:
+                    seen[(kind, value)] = (candidate_id, row.id)
+            fingerprints.append({
+                "resume_id": row.id, "candidate_id": candidate_id, "duplicate_of": match[1] if match else None,
+                "match_reason": reason, "email": email, "phone": phone,
+            })
+        bind.execute(resume_fingerprints.insert(), fingerprints)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    resume_fingerprints = op.create_table('resume_fingerprints',
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('duplicate_of', sa.Integer(), nullable=True),
+    sa.Column('match_reason', sa.String(length=20), nullable=True),
+    sa.Column('similarity', sa.Float(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('signature', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume_data.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+    op.create_index('ix_resume_fingerprints_email_resume', 'resume_fingerprints', ['email', 'resume_id'], unique=False)
+    op.create_index('ix_resume_fingerprints_phone_resume', 'resume_fingerprints', ['phone', 'resume_id'], unique=False)
+    op.create_index('ix_resume_fingerprints_candidate_id', 'resume_fingerprints', ['candidate_id'], unique=False)
+    op.create_index('ix_resume_fingerprints_content_hash', 'resume_fingerprints', ['content_hash'], unique=False)
+    op.create_table('resume_lsh_buckets',
+    sa.Column('bucket', sa.BigInteger(), autoincrement=False, nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume_data.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bucket', 'resume_id')
+    )
+
+    _backfill(resume_fingerprints)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resume_lsh_buckets')
+    op.drop_index('ix_resume_fingerprints_content_hash', table_name='resume_fingerprints')
+    op.drop_index('ix_resume_fingerprints_candidate_id', table_name='resume_fingerprints')
+    op.drop_index('ix_resume_fingerprints_phone_resume', table_name='resume_fingerprints')
+    op.drop_index('ix_resume_fingerprints_email_resume', table_name='resume_fingerprints')
+    op.drop_table('resume_fingerprints')
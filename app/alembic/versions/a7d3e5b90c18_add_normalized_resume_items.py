@@ -0,0 +1,141 @@
+"""Add normalized resume items
+
+Revision ID: a7d3e5b90c18
+Revises: f2a6c9d81b34
+Create Date: 2026-10-17 18:05:27.539140
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5b90c18'
+down_revision: Union[str, None] = 'f2a6c9d81b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_PAGE_SIZE = 1000
+
+# Frozen copy of skills.canonical_skill / skill_term as of this revision: the backfill must keep
+# producing the same names even after the live alias table changes
+LIST_KINDS = ("strengths", "weaknesses", "missing_elements", "recommendations")
+SKILL_NAME_MAX_LENGTH = 255
+SKILL_TERM_MAX_WORDS = 4
+SKILL_TERM_MAX_LENGTH = 40
+SKILL_ALIASES = {
+    "js": "javascript",
+    "java script": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "react.js": "react",
+    "reactjs": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ml": "machine learning",
+    "ci/cd": "ci/cd pipelines",
+    "cicd": "ci/cd pipelines",
+}
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t.,;:-*•\"'()"
+_SENTENCE_PUNCTUATION = re.compile(r"[,;:!?]|\.\s")
+
+
+def canonical_skill(term: str) -> str:
+    name = _WHITESPACE.sub(" ", term.lower()).strip(_EDGE_PUNCTUATION)
+    name = SKILL_ALIASES.get(name, name)
+    return name[:SKILL_NAME_MAX_LENGTH]
+
+
+def skill_term(text: str):
+    name = canonical_skill(text)
+    if not name or len(name) > SKILL_TERM_MAX_LENGTH or len(name.split(" ")) > SKILL_TERM_MAX_WORDS:
+        return None
+    if _SENTENCE_PUNCTUATION.search(name):
+        return None
+    return name
+
+
+def _backfill(skills, resume_items):
+    # Existing rows only have the comma-joined columns, so their lists are split on ", "
+    bind = op.get_bind()
+    resume_data = sa.table('resume_data', sa.column('id'), *(sa.column(kind) for kind in LIST_KINDS))
+    skill_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(resume_data).where(resume_data.c.id > last_id).order_by(resume_data.c.id).limit(BACKFILL_PAGE_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        items = []
+        for row in rows:
+            for kind in LIST_KINDS:
+                for position, text in enumerate(part.strip() for part in (getattr(row, kind) or "").split(", ")):
+                    if text and canonical_skill(text):
+                        items.append({"resume_id": row.id, "kind": kind, "position": position, "text": text})
+        if not items:
+            continue
+
+        # Only term-like items are linked to a skill; sentences keep just their text
+        terms = [skill_term(item["text"]) for item in items]
+        new_names = {term for term in terms if term is not None} - skill_ids.keys()
+        if new_names:
+            bind.execute(skills.insert(), [{"name": name} for name in new_names])
+            skill_ids.update(bind.execute(sa.select(skills.c.name, skills.c.id).where(skills.c.name.in_(new_names))).all())
+        for item, term in zip(items, terms):
+            item["skill_id"] = skill_ids.get(term)
+        bind.execute(resume_items.insert(), items)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    skills = op.create_table('skills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255).with_variant(mysql.VARCHAR(255, charset='utf8mb4', collation='utf8mb4_bin'), 'mysql'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_skills_id'), 'skills', ['id'], unique=False)
+    resume_items = op.create_table('resume_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume_data.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_resume_items_id'), 'resume_items', ['id'], unique=False)
+    op.create_index('ix_resume_items_kind_skill_resume', 'resume_items', ['kind', 'skill_id', 'resume_id'], unique=False)
+    op.create_index('ix_resume_items_resume_id', 'resume_items', ['resume_id'], unique=False)
+
+    _backfill(skills, resume_items)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_items_resume_id', table_name='resume_items')
+    op.drop_index('ix_resume_items_kind_skill_resume', table_name='resume_items')
+    op.drop_index(op.f('ix_resume_items_id'), table_name='resume_items')
+    op.drop_table('resume_items')
+    op.drop_index(op.f('ix_skills_id'), table_name='skills')
+    op.drop_table('skills')
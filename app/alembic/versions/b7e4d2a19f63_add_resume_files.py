@@ -0,0 +1,40 @@
+"""Add resume files index
+
+Revision ID: b7e4d2a19f63
+Revises: 3c1f7a92d4e0
+Create Date: 2026-10-17 11:40:27.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d2a19f63'
+down_revision: Union[str, None] = '3c1f7a92d4e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resume_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('uploaded_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('filename')
+    )
+    op.create_index(op.f('ix_resume_files_id'), 'resume_files', ['id'], unique=False)
+    op.create_index(op.f('ix_resume_files_content_hash'), 'resume_files', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_resume_files_content_hash'), table_name='resume_files')
+    op.drop_index(op.f('ix_resume_files_id'), table_name='resume_files')
+    op.drop_table('resume_files')
@@ -0,0 +1,72 @@
+"""Add analytics rollups
+
+Revision ID: c58e1a4f7b29
+Revises: a7d3e5b90c18
+Create Date: 2026-10-17 18:42:10.866213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e1a4f7b29'
+down_revision: Union[str, None] = 'a7d3e5b90c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resume_data', sa.Column('created_at', sa.DateTime(), nullable=True))
+    # Existing resumes take the upload time of their file, or the migration time when it is unknown
+    op.execute(
+        "UPDATE resume_data SET created_at = COALESCE("
+        "(SELECT uploaded_at FROM resume_files WHERE resume_files.filename = resume_data.filename),"
+        " CURRENT_TIMESTAMP)"
+    )
+
+    op.create_table('analytics_pending',
+    sa.Column('resume_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['resume_id'], ['resume_data.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('resume_id')
+    )
+    op.create_table('analytics_score_buckets',
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('scoring_source', sa.String(length=20), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('resumes', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('metric', 'scoring_source', 'bucket')
+    )
+    op.create_table('analytics_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('resumes', sa.Integer(), nullable=False),
+    sa.Column('shortlisted', sa.Integer(), nullable=False),
+    sa.Column('llm_scored', sa.Integer(), nullable=False),
+    sa.Column('local_scored', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('analytics_skill_counts',
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('skill_id', sa.Integer(), nullable=False),
+    sa.Column('candidates', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.PrimaryKeyConstraint('kind', 'skill_id')
+    )
+    op.create_index('ix_analytics_skill_counts_kind_candidates', 'analytics_skill_counts', ['kind', 'candidates'], unique=False)
+
+    # Queue every existing resume; the compaction job builds the rollups from them
+    op.execute("INSERT INTO analytics_pending (resume_id) SELECT id FROM resume_data")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_analytics_skill_counts_kind_candidates', table_name='analytics_skill_counts')
+    op.drop_table('analytics_skill_counts')
+    op.drop_table('analytics_daily')
+    op.drop_table('analytics_score_buckets')
+    op.drop_table('analytics_pending')
+    op.drop_column('resume_data', 'created_at')
@@ -0,0 +1,35 @@
+"""Add resume score indexes
+
+Revision ID: d41c8f3e7a25
+Revises: 5a9d0e6c2b17
+Create Date: 2026-10-17 14:22:38.671902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8f3e7a25'
+down_revision: Union[str, None] = '5a9d0e6c2b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_resume_data_overall_score_id', 'resume_data', ['overall_score', 'id'], unique=False)
+    op.create_index('ix_resume_data_skills_fit_id', 'resume_data', ['skills_fit', 'id'], unique=False)
+    op.create_index('ix_resume_data_experience_match_id', 'resume_data', ['experience_match', 'id'], unique=False)
+    op.create_index('ix_resume_data_relevance_id', 'resume_data', ['relevance', 'id'], unique=False)
+    op.create_index('ix_resume_data_candidate_gmail', 'resume_data', ['candidate_gmail'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resume_data_candidate_gmail', table_name='resume_data')
+    op.drop_index('ix_resume_data_relevance_id', table_name='resume_data')
+    op.drop_index('ix_resume_data_experience_match_id', table_name='resume_data')
+    op.drop_index('ix_resume_data_skills_fit_id', table_name='resume_data')
+    op.drop_index('ix_resume_data_overall_score_id', table_name='resume_data')
@@ -0,0 +1,38 @@
+"""Add report render status
+
+Revision ID: e83b5f1d9c42
+Revises: d41c8f3e7a25
+Create Date: 2026-10-17 16:48:12.093317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83b5f1d9c42'
+down_revision: Union[str, None] = 'd41c8f3e7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('interview_reports', 'file_path',
+               existing_type=sa.String(length=100),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+    op.add_column('interview_reports', sa.Column('status', sa.String(length=20), nullable=False, server_default='ready'))
+    op.add_column('interview_reports', sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('interview_reports', 'created_at')
+    op.drop_column('interview_reports', 'status')
+    op.alter_column('interview_reports', 'file_path',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=100),
+               existing_nullable=False)
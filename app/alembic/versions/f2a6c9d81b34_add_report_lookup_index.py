@@ -0,0 +1,27 @@
+"""Add report lookup index
+
+Revision ID: f2a6c9d81b34
+Revises: e83b5f1d9c42
+Create Date: 2026-10-17 17:31:54.208816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6c9d81b34'
+down_revision: Union[str, None] = 'e83b5f1d9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_interview_reports_user_status_id', 'interview_reports', ['user_id', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interview_reports_user_status_id', table_name='interview_reports')
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from cachetools import LRUCache
+from sqlalchemy.orm import Session
+
+from models import AnalysisCacheEntry
+
+# ==================== CACHE CONFIGURATION ====================
+ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 50000))
+ANALYSIS_CACHE_LRU_SIZE = int(os.getenv("ANALYSIS_CACHE_LRU_SIZE", 512))
+ANALYSIS_CACHE_EVICT_EVERY = int(os.getenv("ANALYSIS_CACHE_EVICT_EVERY", 100))  # Stores between eviction passes
+ANALYSIS_CACHE_TOUCH_SECONDS = int(os.getenv("ANALYSIS_CACHE_TOUCH_SECONDS", 3600))  # Min gap between access-time writes
+
+# In-process LRU in front of the analysis_cache table:
+# (content_hash, prompt_version) -> (stored_at, parsed_data, last access time written to the table)
+# Memory hits write last_accessed_at at most every ANALYSIS_CACHE_TOUCH_SECONDS, so the table's LRU
+# order (used by _evict) is approximate to that granularity.
+_lru = LRUCache(maxsize=ANALYSIS_CACHE_LRU_SIZE)
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+
+def compute_content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_expired(stored_at: datetime) -> bool:
+    return datetime.utcnow() - stored_at > timedelta(seconds=ANALYSIS_CACHE_TTL_SECONDS)
+
+
+def _count(key: str, amount: int = 1):
+    with _lock:
+        _stats[key] += amount
+
+
+def get_cached_analysis(db: Session, content_hash: str, prompt_version: str):
+    # A read: the access-time bump is left pending in the caller's session and lands with its next commit
+    key = (content_hash, prompt_version)
+
+    with _lock:
+        cached = _lru.get(key)
+    if cached is not None:
+        stored_at, parsed_data, touched_at = cached
+        if not _is_expired(stored_at):
+            now = datetime.utcnow()
+            if now - touched_at > timedelta(seconds=ANALYSIS_CACHE_TOUCH_SECONDS):
+                # Keeps rows served from memory from looking cold to the table's eviction
+                db.query(AnalysisCacheEntry).filter(
+                    AnalysisCacheEntry.content_hash == content_hash,
+                    AnalysisCacheEntry.prompt_version == prompt_version
+                ).update({AnalysisCacheEntry.last_accessed_at: now}, synchronize_session=False)
+                with _lock:
+                    _lru[key] = (stored_at, parsed_data, now)
+            _count("memory_hits")
+            return dict(parsed_data)
+        with _lock:
+            _lru.pop(key, None)
+
+    entry = db.query(AnalysisCacheEntry).filter(
+        AnalysisCacheEntry.content_hash == content_hash,
+        AnalysisCacheEntry.prompt_version == prompt_version
+    ).first()
+
+    if entry is None:
+        _count("misses")
+        return None
+
+    if _is_expired(entry.created_at):
+        # Expired rows are removed by the next eviction pass
+        _count("misses")
+        return None
+
+    entry.last_accessed_at = datetime.utcnow()
+
+    parsed_data = json.loads(entry.result)
+    with _lock:
+        _lru[key] = (entry.created_at, parsed_data, entry.last_accessed_at)
+    _count("db_hits")
+    return dict(parsed_data)
+
+
+def store_analysis(db: Session, content_hash: str, prompt_version: str, parsed_data: dict):
+    # Single upsert: two misses for the same PDF (a concurrent re-upload, or identical files in
+    # one batch) cannot race into a duplicate-key error on ix_analysis_cache_hash_version
+    now = datetime.utcnow()
+    values = {
+        "content_hash": content_hash, "prompt_version": prompt_version, "result": json.dumps(parsed_data),
+        "created_at": now, "last_accessed_at": now,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(AnalysisCacheEntry).values(values)
+    updates = {name: value for name, value in values.items() if name not in ("content_hash", "prompt_version")}
+    if dialect == "mysql":
+        statement = statement.on_duplicate_key_update(updates)
+    else:
+        statement = statement.on_conflict_do_update(index_elements=["content_hash", "prompt_version"], set_=updates)
+    db.execute(statement)
+    db.commit()
+
+    with _lock:
+        _lru[(content_hash, prompt_version)] = (now, dict(parsed_data), now)
+        _stats["stores"] += 1
+        evict_due = _stats["stores"] % ANALYSIS_CACHE_EVICT_EVERY == 0
+
+    # The table is only counted every ANALYSIS_CACHE_EVICT_EVERY stores, so it may briefly
+    # run over the size limit by that many rows
+    if evict_due:
+        _evict(db)
+
+
+def _evict(db: Session):
+    # Drop expired rows first, then the least recently used ones above the size limit
+    cutoff = datetime.utcnow() - timedelta(seconds=ANALYSIS_CACHE_TTL_SECONDS)
+    expired = db.query(AnalysisCacheEntry).filter(
+        AnalysisCacheEntry.created_at < cutoff
+    ).delete(synchronize_session=False)
+
+    overflow = db.query(AnalysisCacheEntry).count() - ANALYSIS_CACHE_MAX_ENTRIES
+    evicted = 0
+    if overflow > 0:
+        stale_ids = [
+            row.id for row in db.query(AnalysisCacheEntry.id)
+            .order_by(AnalysisCacheEntry.last_accessed_at.asc())
+            .limit(overflow)
+        ]
+        evicted = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+
+    if expired or evicted:
+        db.commit()
+        _count("evictions", expired + evicted)
+
+
+def cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["memory_entries"] = len(_lru)
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    stats["hit_ratio"] = (stats["memory_hits"] + stats["db_hits"]) / lookups if lookups else 0.0
+    return stats
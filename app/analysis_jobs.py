@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+# ==================== JOB QUEUE CONFIGURATION ====================
+JOB_STORE_PATH = os.getenv("ANALYSIS_JOB_STORE", "analysis_jobs.db")
+JOB_EXECUTOR = os.getenv("ANALYSIS_JOB_EXECUTOR", "thread")  # "thread" or "process"
+JOB_WORKERS = int(os.getenv("ANALYSIS_JOB_WORKERS", 4))
+JOB_QUEUE_SIZE = int(os.getenv("ANALYSIS_JOB_QUEUE_SIZE", 100))
+# Every worker process sharing the job store heartbeats the jobs it owns; jobs whose heartbeat is
+# older than JOB_STALE_SECONDS belong to a dead worker and are reclaimed by a live one
+JOB_HEARTBEAT_SECONDS = float(os.getenv("ANALYSIS_JOB_HEARTBEAT_SECONDS", 10))
+JOB_STALE_SECONDS = float(os.getenv("ANALYSIS_JOB_STALE_SECONDS", 60))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# ==================== LOCAL JOB STORE ====================
+# Jobs live in a local SQLite file so anything still queued or running is picked up again after a restart
+@contextmanager
+def _connect():
+    conn = sqlite3.connect(JOB_STORE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def init_job_store():
+    with _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " filename TEXT NOT NULL,"
+            " file_path TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_analysis_jobs_status ON analysis_jobs (status)")
+
+        # Columns added after the first release; stores created before them are upgraded in place
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(analysis_jobs)")}
+        for name, column_type in (("owner", "TEXT"), ("heartbeat_at", "TEXT"), ("charged_user_id", "INTEGER")):
+            if name not in columns:
+                conn.execute(f"ALTER TABLE analysis_jobs ADD COLUMN {name} {column_type}")
+
+
+def _update_job(job_id: str, status: str, result: dict = None, error: str = None):
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE analysis_jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error,
+             datetime.utcnow().isoformat(), job_id)
+        )
+
+
+def get_job(job_id: str):
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+
+    job = {
+        "job_id": row["id"],
+        "status": row["status"],
+        "filename": row["filename"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+    if row["result"] is not None:
+        job["result"] = json.loads(row["result"])
+    if row["error"] is not None:
+        job["error"] = row["error"]
+    return job
+
+
+# ==================== WORKER ====================
+def _run_job(job_id: str, file_path: str, filename: str, content_hash: str):
+    # Imported here so process-pool workers set up their own DB engine and Gemini client
+    from database import SessionLocal
+    from analysis_pipeline import run_analysis
+    from blob_storage import resume_url
+    from models import AnalysisJobResult
+
+    _update_job(job_id, RUNNING)
+    db = SessionLocal()
+    try:
+        # A job resumed after a crash may already have committed its resume; that result is reused
+        # instead of inserting the resume a second time
+        recorded = db.get(AnalysisJobResult, job_id)
+        if recorded is not None:
+            resume_id, parsed_data = recorded.resume_id, json.loads(recorded.result)
+        else:
+            resume_entry, parsed_data = run_analysis(db, file_path, filename, content_hash, job_id)
+            resume_id = resume_entry.id
+        parsed_data["resume_id"] = resume_id
+        parsed_data["resume_url"] = resume_url(filename, content_hash)
+        _update_job(job_id, COMPLETED, result=parsed_data)
+    except HTTPException as e:
+        db.rollback()
+        _update_job(job_id, FAILED, error=str(e.detail))
+        return False
+    except Exception as e:
+        db.rollback()
+        _update_job(job_id, FAILED, error=f"Unexpected error: {str(e)}")
+        return False
+    else:
+        # Once the job store holds the result the row has served its purpose; a leftover row is harmless
+        try:
+            db.query(AnalysisJobResult).filter(AnalysisJobResult.job_id == job_id).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+        return True
+    finally:
+        db.close()
+
+
+class AnalysisJobQueue:
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_QUEUE_SIZE, executor: str = JOB_EXECUTOR):
+        if executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis-job")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._resumed = False
+
+    def _dispatch(self, job_id: str, file_path: str, filename: str, content_hash: str, holds_slot: bool = True,
+                  on_failure=None):
+        future = self._executor.submit(_run_job, job_id, file_path, filename, content_hash)
+        if holds_slot:
+            future.add_done_callback(lambda _: self._slots.release())
+        if on_failure is not None:
+            # Jobs cancelled by a shutdown are resumed on the next start, so only real failures count
+            future.add_done_callback(
+                lambda f: on_failure() if not f.cancelled() and (f.exception() is not None or not f.result()) else None
+            )
+
+    def reserve(self) -> bool:
+        # Backpressure: refuse new work instead of growing the backlog without bound. Callers take
+        # the slot before doing any work for the job and hand it to submit(reserved=True).
+        return self._slots.acquire(blocking=False)
+
+    def release(self):
+        # Gives back a reserved slot that never reached submit()
+        self._slots.release()
+
+    def submit(self, file_path: str, filename: str, content_hash: str, on_failure=None,
+               reserved: bool = False, charged_user_id: int = None) -> str:
+        # on_failure is called (from an executor thread) when the job ends in the failed state.
+        # charged_user_id is stored so a job resumed by another process can still refund its attempt.
+        if not reserved and not self.reserve():
+            raise QueueFullError("Analysis queue is full")
+
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+        try:
+            with _connect() as conn:
+                conn.execute(
+                    "INSERT INTO analysis_jobs (id, status, filename, file_path, content_hash, created_at, updated_at,"
+                    " owner, heartbeat_at, charged_user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, filename, str(file_path), content_hash, now, now, WORKER_ID, now, charged_user_id)
+                )
+            self._dispatch(job_id, str(file_path), filename, content_hash, on_failure=on_failure)
+        except Exception:
+            self._slots.release()
+            raise
+        return job_id
+
+    def heartbeat(self):
+        with _connect() as conn:
+            conn.execute(
+                "UPDATE analysis_jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                (datetime.utcnow().isoformat(), WORKER_ID, QUEUED, RUNNING)
+            )
+
+    def resume_pending(self, on_failure=None) -> int:
+        # Jobs left queued or running by a dead worker (stale heartbeat) are claimed and re-run from
+        # the start; jobs a live sibling is still executing are left alone. on_failure(user_id) is
+        # called (from an executor thread) when a claimed job that was charged ends in the failed state.
+        self._resumed = True  # From now on run_job_heartbeat retries the reclaim, even if this one fails
+        now = datetime.utcnow()
+        cutoff = (now - timedelta(seconds=JOB_STALE_SECONDS)).isoformat()
+        claimed = []
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT id, file_path, filename, content_hash, heartbeat_at, charged_user_id FROM analysis_jobs"
+                " WHERE status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?) ORDER BY created_at",
+                (QUEUED, RUNNING, cutoff)
+            ).fetchall()
+            for row in rows:
+                # Guarded on the heartbeat read above, so two workers never claim the same job
+                result = conn.execute(
+                    "UPDATE analysis_jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ?"
+                    " WHERE id = ? AND status IN (?, ?) AND heartbeat_at IS ?",
+                    (QUEUED, WORKER_ID, now.isoformat(), now.isoformat(), row["id"], QUEUED, RUNNING,
+                     row["heartbeat_at"])
+                )
+                if result.rowcount:
+                    claimed.append(row)
+
+        for row in claimed:
+            # Recovered jobs are always re-queued, even when they alone exceed the pending limit
+            holds_slot = self._slots.acquire(blocking=False)
+            refund = None
+            if on_failure is not None and row["charged_user_id"] is not None:
+                refund = lambda user_id=row["charged_user_id"]: on_failure(user_id)
+            self._dispatch(row["id"], row["file_path"], row["filename"], row["content_hash"], holds_slot, refund)
+        return len(claimed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_job_heartbeat(on_failure=None):
+    # Keeps this worker's jobs fresh and, once the start-up resume has run, reclaims the jobs of
+    # workers that died since
+    queue = get_job_queue()
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            await run_in_threadpool(queue.heartbeat)
+            if queue._resumed:
+                reclaimed = await run_in_threadpool(queue.resume_pending, on_failure)
+                if reclaimed:
+                    logger.warning("Reclaimed %d analysis jobs from a stopped worker", reclaimed)
+        except Exception:
+            logger.exception("Analysis job heartbeat failed; retrying on the next interval")
+
+
+job_queue = None
+
+
+def get_job_queue() -> AnalysisJobQueue:
+    global job_queue
+    if job_queue is None:
+        init_job_store()
+        job_queue = AnalysisJobQueue()
+    return job_queue
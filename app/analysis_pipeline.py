@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+from datetime import datetime
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
+from models import ResumeData, AnalysisJobResult
+from pdf_extraction import extract_pages
+from text_compaction import compact_resume_text, PAGE_SEPARATOR
+from prescoring import prescore_resume
+from search_index import index_resume
+from vector_index import add_resume_embeddings, embedding_text
+from llm_client import get_llm_client, LLMTimeoutError, LLMUnavailableError
+from llm_output import generation_config, parse_analysis, AnalysisParseError
+from analysis_cache import get_cached_analysis, store_analysis
+from blob_storage import write_blob, index_filename
+from skills import joined_preview, store_resume_items
+from analytics import record_ingested
+from dedup import DEDUP_ENABLED, fingerprint, find_duplicate, record_fingerprint, reusable_match, public_match
+from metrics import span
+
+# ==================== RESUME ANALYSIS PIPELINE ====================
+# Shared by the /analyze_resume/ endpoints, the batch ingest and the background job workers
+UPLOAD_FOLDER = "uploaded_resumes"  # Legacy location of uploads saved under their client filename
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)  # Ensure folder exists
+
+logger = logging.getLogger(__name__)
+
+def extract_text_from_pdf(pdf_file) -> str:
+    try:
+        with span("pdf_extract"):
+            text = PAGE_SEPARATOR.join(extract_pages(pdf_file))
+        if not text.strip():
+            raise ValueError("No readable text found in the PDF.")
+        return text
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to extract text: {str(e)}")
+
+def prepare_prompt_text(text: str) -> str:
+    # Strips headers/footers, page numbers and boilerplate and fits the text to the prompt token budget
+    compacted, report = compact_resume_text(text)
+    logger.info(
+        "Resume text compacted: %d -> %d tokens (%d saved, truncated=%s)",
+        report["tokens_before"], report["tokens_after"], report["tokens_saved"], report["truncated"]
+    )
+    return compacted
+
+# Bump whenever the prompt changes so cached analyses from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+def build_analysis_prompt(text: str) -> str:
+    return (
+        "Analyze this resume and provide details in JSON format:\n"
+        "{"
+        '"overall_score": <numeric value>,\n'
+        '"relevance": <numeric value>,\n'
+        '"skills_fit": <numeric value>,\n'
+        '"experience_match": <numeric value>,\n'
+        '"cultural_fit": <numeric value>,\n'
+        '"strengths": <list of key strengths>,\n'
+        '"weaknesses": <list of key weaknesses>,\n'
+        '"missing_elements": <list of missing qualifications>,\n'
+        '"recommendations": <list of suggestions>,\n'
+        '"candidate_info": { "name": "<candidate name>", "gmail": "<email>", "phone": "<phone>" }\n'
+        "}"
+        f"\nResume text:\n{text}"
+    )
+
+def analyze_resume_with_gemini(text: str) -> str:
+    try:
+        with span("llm_call"):
+            return get_llm_client().generate(build_analysis_prompt(text), **generation_config()).strip()
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Gemini API timeout: {str(e)}")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Gemini API unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gemini API error: {str(e)}")
+
+def stream_resume_with_gemini(text: str):
+    # Same prompt and error mapping as analyze_resume_with_gemini, yielding the response as it streams
+    try:
+        yield from get_llm_client().generate_stream(build_analysis_prompt(text), **generation_config())
+    except LLMTimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Gemini API timeout: {str(e)}")
+    except LLMUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Gemini API unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Gemini API error: {str(e)}")
+
+def parse_gemini_response(response_text: str) -> dict:
+    # Validated against the ResumeAnalysis schema; may make one cheap repair call, so run it off the event loop
+    try:
+        with span("response_parse"):
+            return parse_analysis(response_text)
+    except AnalysisParseError as e:
+        raise HTTPException(status_code=500, detail=f"Parsing error: {str(e)}")
+
+def _score(parsed_data: dict, field: str):
+    value = parsed_data.get(field)
+    return float(value) if value is not None else None
+
+def build_resume_entry(filename: str, parsed_data: dict) -> ResumeData:
+    return ResumeData(
+        filename=filename,
+        overall_score=_score(parsed_data, "overall_score"),
+        relevance=_score(parsed_data, "relevance"),
+        skills_fit=_score(parsed_data, "skills_fit"),
+        experience_match=_score(parsed_data, "experience_match"),
+        cultural_fit=_score(parsed_data, "cultural_fit"),
+        strengths=joined_preview(parsed_data.get("strengths", [])),
+        weaknesses=joined_preview(parsed_data.get("weaknesses", [])),
+        missing_elements=joined_preview(parsed_data.get("missing_elements", [])),
+        recommendations=joined_preview(parsed_data.get("recommendations", [])),
+        candidate_name=parsed_data["candidate_info"]["name"],
+        candidate_gmail=parsed_data["candidate_info"]["gmail"],
+        candidate_phone=parsed_data["candidate_info"]["phone"],
+        scoring_source=parsed_data.get("scoring_source", "llm"),
+        created_at=datetime.utcnow()
+    )
+
+def save_pdf_stream(db: Session, filename: str, fileobj):
+    # Uploads are streamed into content-addressed storage; the filename only becomes an index entry
+    with span("upload_write"):
+        blob_path, content_hash, size = write_blob(fileobj)
+        index_filename(db, filename, content_hash, size)
+    return blob_path, content_hash
+
+def save_upload(db: Session, file: UploadFile):
+    return save_pdf_stream(db, file.filename, file.file)
+
+def prepare_analysis(db: Session, file_path, content_hash: str) -> dict:
+    # Everything before the Gemini call. "parsed_data" is already set when no LLM call is needed,
+    # and "source" says where it came from: cache, duplicate, local or (once the caller fills it) llm.
+    analysis = {"text": None, "parsed_data": None, "fp": None, "match": None, "source": "cache"}
+
+    # Duplicate uploads skip extraction and the Gemini call entirely
+    with span("cache_lookup"):
+        analysis["parsed_data"] = get_cached_analysis(db, content_hash, PROMPT_VERSION)
+    if analysis["parsed_data"] is not None:
+        return analysis
+
+    text = analysis["text"] = extract_text_from_pdf(file_path)
+
+    # The same candidate re-applying with a lightly edited CV can reuse the earlier analysis
+    if DEDUP_ENABLED:
+        with span("dedup_lookup"):
+            fp = analysis["fp"] = fingerprint(text)
+            match = analysis["match"] = find_duplicate(db, fp, content_hash)
+        if reusable_match(match) and match["content_hash"] not in (None, content_hash):
+            analysis["parsed_data"] = get_cached_analysis(db, match["content_hash"], PROMPT_VERSION)
+            if analysis["parsed_data"] is not None:
+                analysis["source"] = "duplicate"
+                return analysis
+
+    # Clearly out-of-scope resumes are scored locally and never reach Gemini
+    with span("prescore"):
+        analysis["parsed_data"] = prescore_resume(text)
+    analysis["source"] = "local" if analysis["parsed_data"] is not None else "llm"
+    return analysis
+
+def persist_analysis(db: Session, filename: str, content_hash: str, analysis: dict, job_id: str = None):
+    text, parsed_data, match = analysis["text"], analysis["parsed_data"], analysis["match"]
+    resume_entry = build_resume_entry(filename, parsed_data)
+
+    with span("db_commit"):
+        db.add(resume_entry)
+        db.flush()
+        store_resume_items(db, [(resume_entry.id, parsed_data)])
+        record_ingested(db, [resume_entry.id])
+        if DEDUP_ENABLED:
+            # Identifiers from the analysis are more reliable than the ones found in the text
+            fp = analysis["fp"]
+            stored_fp = fingerprint(text, parsed_data)
+            if fp is None or (stored_fp["email"], stored_fp["phone"]) != (fp["email"], fp["phone"]):
+                match = find_duplicate(db, stored_fp, content_hash)
+            record_fingerprint(db, resume_entry.id, content_hash, stored_fp, match)
+            parsed_data["duplicate"] = public_match(match)
+        if job_id is not None:
+            db.add(AnalysisJobResult(job_id=job_id, resume_id=resume_entry.id, result=json.dumps(parsed_data)))
+        db.commit()
+        db.refresh(resume_entry)
+
+    with span("search_index"):
+        indexed_text = index_resume(resume_entry.id, content_hash, text, parsed_data)
+    with span("vector_index"):
+        add_resume_embeddings([resume_entry.id], [embedding_text(indexed_text, parsed_data)])
+
+    return resume_entry, parsed_data
+
+def run_analysis(db: Session, file_path, filename: str, content_hash: str, job_id: str = None):
+    analysis = prepare_analysis(db, file_path, content_hash)
+    if analysis["parsed_data"] is None:
+        analyzed_data = analyze_resume_with_gemini(prepare_prompt_text(analysis["text"]))
+        analysis["parsed_data"] = parse_gemini_response(analyzed_data)
+        store_analysis(db, content_hash, PROMPT_VERSION, analysis["parsed_data"])
+    return persist_analysis(db, filename, content_hash, analysis, job_id)
@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+
+import anyio
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from starlette.concurrency import iterate_in_threadpool
+
+from database import SessionLocal
+from analysis_cache import store_analysis
+from blob_storage import resume_url
+from analysis_pipeline import (
+    PROMPT_VERSION, prepare_analysis, persist_analysis, prepare_prompt_text, stream_resume_with_gemini,
+    parse_gemini_response
+)
+from llm_output import IncrementalFieldParser
+from text_compaction import PAGE_SEPARATOR
+
+# ==================== STREAMING ANALYSIS CONFIGURATION ====================
+STREAM_TOKEN_EVENTS = os.getenv("STREAM_TOKEN_EVENTS", "true").lower() == "true"  # Off: field events only
+
+logger = logging.getLogger(__name__)
+
+
+def _event(name: str, payload: dict) -> bytes:
+    # Server-Sent Events framing; json.dumps never emits raw newlines, so one data line is enough
+    return f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode()
+
+
+async def stream_analysis(filename: str, file_path, content_hash: str, on_error=None):
+    # Events, in order: upload, extracted (skipped on a cache hit), token* and field* while Gemini
+    # streams (all fields at once when no LLM call was needed), analysis, persisted, done.
+    # Failures end the stream with an error event carrying the status the plain endpoint would return.
+    # on_error is also awaited when the client goes away before the persisted event.
+    # Dependencies are already torn down while the response streams, so the stream owns its session
+    db = SessionLocal()
+    upstream = None
+    persisted = failed = False
+    try:
+        yield _event("upload", {"filename": filename, "content_hash": content_hash})
+        analysis = await run_in_threadpool(prepare_analysis, db, file_path, content_hash)
+        if analysis["text"] is not None:
+            yield _event("extracted", {
+                "pages": analysis["text"].count(PAGE_SEPARATOR) + 1,
+                "characters": len(analysis["text"]),
+            })
+
+        if analysis["parsed_data"] is None:
+            chunks = []
+            parser = IncrementalFieldParser()
+            prompt_text = await run_in_threadpool(prepare_prompt_text, analysis["text"])
+            upstream = stream_resume_with_gemini(prompt_text)
+            async for chunk in iterate_in_threadpool(upstream):
+                chunks.append(chunk)
+                if STREAM_TOKEN_EVENTS:
+                    yield _event("token", {"text": chunk})
+                for key, value in parser.feed(chunk):
+                    yield _event("field", {"key": key, "value": value})
+
+            parsed_data = analysis["parsed_data"] = await run_in_threadpool(parse_gemini_response, "".join(chunks))
+            await run_in_threadpool(store_analysis, db, content_hash, PROMPT_VERSION, parsed_data)
+        else:
+            for key, value in analysis["parsed_data"].items():
+                yield _event("field", {"key": key, "value": value})
+
+        yield _event("analysis", {"source": analysis["source"], "data": analysis["parsed_data"]})
+
+        resume_entry, parsed_data = await run_in_threadpool(persist_analysis, db, filename, content_hash, analysis)
+        persisted = True
+        yield _event("persisted", {
+            "resume_id": resume_entry.id,
+            "resume_url": resume_url(filename, content_hash),
+            "duplicate": parsed_data.get("duplicate"),
+        })
+        yield _event("done", {})
+
+    except Exception as e:
+        failed = True
+        db.rollback()
+        if on_error is not None:
+            await on_error()
+        if isinstance(e, HTTPException):
+            yield _event("error", {"status": e.status_code, "detail": e.detail})
+        else:
+            logger.exception("Streaming analysis of %s failed", filename)
+            yield _event("error", {"status": 500, "detail": f"Unexpected error: {str(e)}"})
+    finally:
+        # A disconnect ends the generator with GeneratorExit or a cancellation instead of an exception
+        if upstream is not None:
+            _close_upstream(upstream)
+        db.close()
+        if not persisted and not failed and on_error is not None:
+            # Shielded: the response's cancel scope would otherwise cancel the refund as well
+            with anyio.CancelScope(shield=True):
+                await on_error()
+
+
+def _close_upstream(upstream):
+    # Releases the LLM connection slot and the HTTP stream now rather than at garbage collection.
+    # A generator still running a chunk on a worker thread cannot be closed; it ends with that chunk.
+    try:
+        upstream.close()
+    except ValueError:
+        pass
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import (
+    AnalyticsDaily, AnalyticsPending, AnalyticsScoreBucket, AnalyticsSkillCount, ResumeData, ResumeItem
+)
+
+# ==================== ANALYTICS CONFIGURATION ====================
+ANALYTICS_COMPACT_INTERVAL_SECONDS = float(os.getenv("ANALYTICS_COMPACT_INTERVAL_SECONDS", 30))
+ANALYTICS_COMPACT_BATCH = int(os.getenv("ANALYTICS_COMPACT_BATCH", 5000))
+ANALYTICS_SHORTLIST_SCORE = float(os.getenv("ANALYTICS_SHORTLIST_SCORE", 70))
+
+HISTOGRAM_METRICS = ("overall_score", "skills_fit")
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== INGEST ====================
+def record_ingested(db: Session, resume_ids: list):
+    # Called inside the ingest transaction: plain inserts, so concurrent ingests never contend
+    # on the rollup rows. The compaction job folds them into the rollups.
+    if resume_ids:
+        db.execute(insert(AnalyticsPending), [{"resume_id": resume_id} for resume_id in resume_ids])
+
+
+# ==================== COMPACTION ====================
+def _bucket(score: float) -> int:
+    return min(10, max(0, int(score // 10)))
+
+
+def _increment(db: Session, model, rows: list, counters: tuple):
+    # Upsert that adds to the existing counters: ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(model).values(rows)
+    if dialect == "mysql":
+        statement = statement.on_duplicate_key_update(
+            {name: getattr(model, name) + statement.inserted[name] for name in counters}
+        )
+    else:
+        keys = [column.name for column in model.__table__.primary_key.columns]
+        statement = statement.on_conflict_do_update(
+            index_elements=keys, set_={name: getattr(model, name) + statement.excluded[name] for name in counters}
+        )
+    db.execute(statement)
+
+
+def _compact_batch(db: Session) -> int:
+    # SKIP LOCKED lets several workers compact at once without folding the same resume twice
+    pending_ids = db.scalars(
+        select(AnalyticsPending.resume_id).limit(ANALYTICS_COMPACT_BATCH).with_for_update(skip_locked=True)
+    ).all()
+    if not pending_ids:
+        return 0
+
+    rows = db.execute(
+        select(ResumeData.created_at, ResumeData.scoring_source, *(getattr(ResumeData, m) for m in HISTOGRAM_METRICS))
+        .where(ResumeData.id.in_(pending_ids))
+    ).all()
+
+    buckets = defaultdict(lambda: [0, 0.0])
+    daily = defaultdict(lambda: {"resumes": 0, "shortlisted": 0, "llm_scored": 0, "local_scored": 0})
+    for row in rows:
+        source = row.scoring_source or "llm"
+        for metric in HISTOGRAM_METRICS:
+            score = getattr(row, metric)
+            if score is not None:
+                bucket = buckets[(metric, source, _bucket(score))]
+                bucket[0] += 1
+                bucket[1] += score
+
+        day = daily[(row.created_at or datetime.utcnow()).date()]
+        day["resumes"] += 1
+        day["shortlisted"] += int(row.overall_score is not None and row.overall_score >= ANALYTICS_SHORTLIST_SCORE)
+        day["local_scored" if source == "local" else "llm_scored"] += 1
+
+    skill_counts = db.execute(
+        select(ResumeItem.kind, ResumeItem.skill_id, func.count(distinct(ResumeItem.resume_id)))
+        .where(ResumeItem.resume_id.in_(pending_ids), ResumeItem.skill_id.isnot(None))
+        .group_by(ResumeItem.kind, ResumeItem.skill_id)
+    ).all()
+
+    _increment(db, AnalyticsScoreBucket, [
+        {"metric": metric, "scoring_source": source, "bucket": bucket, "resumes": count, "score_sum": total}
+        for (metric, source, bucket), (count, total) in buckets.items()
+    ], ("resumes", "score_sum"))
+    _increment(db, AnalyticsDaily, [{"day": day, **counts} for day, counts in daily.items()],
+               ("resumes", "shortlisted", "llm_scored", "local_scored"))
+    _increment(db, AnalyticsSkillCount, [
+        {"kind": kind, "skill_id": skill_id, "candidates": count} for kind, skill_id, count in skill_counts
+    ], ("candidates",))
+
+    db.execute(delete(AnalyticsPending).where(AnalyticsPending.resume_id.in_(pending_ids)))
+    db.commit()
+    return len(pending_ids)
+
+
+def compact_rollups() -> int:
+    # Folds every pending resume into the rollup tables; returns how many were folded
+    db = SessionLocal()
+    try:
+        folded = 0
+        while True:
+            count = _compact_batch(db)
+            folded += count
+            if count < ANALYTICS_COMPACT_BATCH:
+                return folded
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_compactor():
+    while True:
+        await asyncio.sleep(ANALYTICS_COMPACT_INTERVAL_SECONDS)
+        try:
+            folded = await run_in_threadpool(compact_rollups)
+            if folded:
+                logger.info("Folded %d resumes into the analytics rollups", folded)
+        except Exception:
+            logger.exception("Analytics compaction failed; retrying on the next interval")
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import zipfile
+from contextlib import nullcontext
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from prescoring import prescore_resume
+from search_index import index_resumes
+from vector_index import add_resume_embeddings, embedding_text
+from skills import store_resume_items
+from analytics import record_ingested
+from blob_storage import resume_url
+from dedup import DEDUP_ENABLED, link_duplicates
+from metrics import span
+from analysis_cache import get_cached_analysis, store_analysis
+from analysis_pipeline import (
+    PROMPT_VERSION, save_pdf_stream, extract_text_from_pdf, prepare_prompt_text,
+    analyze_resume_with_gemini, parse_gemini_response, build_resume_entry
+)
+
+# ==================== BATCH INGEST CONFIGURATION ====================
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 500))
+BATCH_MAX_MEMBER_BYTES = int(os.getenv("BATCH_MAX_MEMBER_BYTES", 20 * 1024 * 1024))
+BATCH_EXTRACT_CONCURRENCY = int(os.getenv("BATCH_EXTRACT_CONCURRENCY", 4))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", 8))
+BATCH_COMMIT_SIZE = int(os.getenv("BATCH_COMMIT_SIZE", 50))
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== UPLOAD COLLECTION ====================
+def _batch_members(files: list[UploadFile]):
+    # (filename, opener) for every PDF in the upload and every PDF inside its ZIPs; nothing is written
+    for file in files:
+        if file.filename.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(file.file)
+                for member in archive.infolist():
+                    if member.is_dir() or not member.filename.endswith(".pdf"):
+                        continue
+                    if member.file_size > BATCH_MAX_MEMBER_BYTES:
+                        raise HTTPException(status_code=413, detail=f"{member.filename} is too large")
+                    yield Path(member.filename).name, lambda archive=archive, member=member: archive.open(member)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid ZIP archive")
+        elif file.filename.endswith(".pdf"):
+            yield file.filename, lambda file=file: nullcontext(file.file)
+        else:
+            raise HTTPException(status_code=400, detail="Only PDF and ZIP files are supported")
+
+
+def count_batch_files(files: list[UploadFile]) -> int:
+    # Validates the upload and counts its PDFs without writing anything, so the quota can be
+    # charged before any blob or filename index row exists
+    count = 0
+    for _ in _batch_members(files):
+        count += 1
+        if count > BATCH_MAX_FILES:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_FILES} files")
+    if not count:
+        raise HTTPException(status_code=400, detail="No PDF files found in the upload")
+    return count
+
+
+def collect_batch_files(files: list[UploadFile]):
+    # Streams every PDF (and every PDF inside a ZIP) into blob storage up front; returns (filename, file_path, content_hash)
+    items = []
+    db = SessionLocal()
+    try:
+        for filename, open_member in _batch_members(files):
+            if len(items) >= BATCH_MAX_FILES:
+                raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_FILES} files")
+            with open_member() as fileobj:
+                file_path, content_hash = save_pdf_stream(db, filename, fileobj)
+            items.append((filename, file_path, content_hash))
+    finally:
+        db.close()
+
+    if not items:
+        raise HTTPException(status_code=400, detail="No PDF files found in the upload")
+    return items
+
+
+# ==================== PER-FILE ANALYSIS ====================
+def _lookup_cached(content_hash: str):
+    db = SessionLocal()
+    try:
+        return get_cached_analysis(db, content_hash, PROMPT_VERSION)
+    finally:
+        db.close()
+
+
+def _store_cached(content_hash: str, parsed_data: dict):
+    db = SessionLocal()
+    try:
+        store_analysis(db, content_hash, PROMPT_VERSION, parsed_data)
+    finally:
+        db.close()
+
+
+async def _analyze_one(filename: str, file_path, content_hash: str, extract_slots, llm_slots):
+    # Returns (parsed_data, extracted text or None when the analysis came from the cache).
+    # All CPU and DB work runs in the threadpool under a semaphore, so a large batch neither blocks
+    # the event loop nor takes every threadpool thread and DB connection at once.
+    async with extract_slots:
+        parsed_data = await run_in_threadpool(_lookup_cached, content_hash)
+        if parsed_data is not None:
+            return parsed_data, None
+
+        text = await run_in_threadpool(extract_text_from_pdf, file_path)
+        local_result = await run_in_threadpool(prescore_resume, text)
+    if local_result is not None:
+        return local_result, text
+
+    async with llm_slots:
+        analyzed_data = await run_in_threadpool(lambda: analyze_resume_with_gemini(prepare_prompt_text(text)))
+        parsed_data = await run_in_threadpool(parse_gemini_response, analyzed_data)
+
+    await run_in_threadpool(_store_cached, content_hash, parsed_data)
+    return parsed_data, text
+
+
+async def _analyze_tagged(item, extract_slots, llm_slots):
+    filename, file_path, content_hash = item
+    try:
+        return item, await _analyze_one(filename, file_path, content_hash, extract_slots, llm_slots), None
+    except HTTPException as e:
+        return item, None, str(e.detail)
+    except Exception as e:
+        return item, None, f"Unexpected error: {str(e)}"
+
+
+# ==================== BULK PERSISTENCE ====================
+def _insert_chunk(rows):
+    # One transaction per chunk instead of one commit per resume
+    db = SessionLocal()
+    try:
+        with span("db_commit"):
+            entries = [build_resume_entry(filename, parsed_data) for filename, _, _, parsed_data in rows]
+            db.add_all(entries)
+            db.flush()
+            ids = [entry.id for entry in entries]
+            store_resume_items(db, [(resume_id, row[3]) for resume_id, row in zip(ids, rows)])
+            record_ingested(db, ids)
+            if DEDUP_ENABLED:
+                link_duplicates(db, [(resume_id, content_hash, text, parsed_data)
+                                     for resume_id, (_, content_hash, text, parsed_data) in zip(ids, rows)])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    texts = [text for _, _, text, _ in rows]
+    try:
+        texts = index_resumes(
+            (resume_id, content_hash, text, parsed_data)
+            for resume_id, (_, content_hash, text, parsed_data) in zip(ids, rows)
+        )
+    except sqlite3.Error:
+        logger.exception("Failed to index batch of %d resumes", len(ids))
+
+    add_resume_embeddings(ids, [embedding_text(text, row[3]) for text, row in zip(texts, rows)])
+    return ids
+
+
+def _line(payload: dict) -> bytes:
+    return (json.dumps(payload) + "\n").encode()
+
+
+async def stream_batch(items, on_failure=None):
+    # on_failure(count) is awaited for files that fail analysis or whose chunk fails to commit
+    started = time.perf_counter()
+    extract_slots = asyncio.Semaphore(BATCH_EXTRACT_CONCURRENCY)
+    llm_slots = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    tasks = [asyncio.create_task(_analyze_tagged(item, extract_slots, llm_slots)) for item in items]
+
+    pending_rows = []
+    succeeded = failed = persisted = 0
+
+    async def flush():
+        nonlocal persisted
+        rows, pending_rows[:] = list(pending_rows), []
+        try:
+            ids = await run_in_threadpool(_insert_chunk, rows)
+        except Exception as e:
+            if on_failure is not None:
+                await on_failure(len(rows))
+            return _line({"event": "commit_failed", "filenames": [row[0] for row in rows], "error": str(e)})
+        persisted += len(ids)
+        return _line({"event": "committed", "resume_ids": dict(zip([row[0] for row in rows], ids))})
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            (filename, _, content_hash), result, error = await next_done
+
+            if error is not None:
+                failed += 1
+                if on_failure is not None:
+                    await on_failure(1)
+                yield _line({"event": "result", "filename": filename, "status": "error", "error": error})
+                continue
+
+            succeeded += 1
+            parsed_data, text = result
+            parsed_data["resume_url"] = resume_url(filename, content_hash)
+            yield _line({"event": "result", "filename": filename, "status": "ok", "data": parsed_data})
+
+            pending_rows.append((filename, content_hash, text, parsed_data))
+            if len(pending_rows) >= BATCH_COMMIT_SIZE:
+                yield await flush()
+
+        if pending_rows:
+            yield await flush()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    yield _line({
+        "event": "summary",
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": failed,
+        "persisted": persisted,
+        "elapsed_seconds": round(elapsed, 3),
+        "resumes_per_minute": round(len(items) / elapsed * 60, 1) if elapsed else None,
+    })
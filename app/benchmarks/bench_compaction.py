@@ -0,0 +1,69 @@
+# Measures how much the compaction stage shrinks prompts over a corpus of PDFs and,
+# with --score, whether the analysis scores stay stable.
+#
+#   cd app && python -m benchmarks.bench_compaction --corpus path/to/pdfs [--score] [--output out.json]
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+from analysis_pipeline import extract_text_from_pdf, analyze_resume_with_gemini, parse_gemini_response
+from text_compaction import compact_resume_text, PROMPT_TOKEN_BUDGET
+
+SCORE_FIELDS = ["overall_score", "relevance", "skills_fit", "experience_match", "cultural_fit"]
+
+
+def score(text: str) -> dict:
+    parsed = parse_gemini_response(analyze_resume_with_gemini(text))
+    return {field: float(parsed[field]) for field in SCORE_FIELDS}
+
+
+def run(corpus: Path, with_scores: bool, token_budget: int) -> dict:
+    files = []
+    for pdf_path in sorted(corpus.glob("*.pdf")):
+        raw_text = extract_text_from_pdf(pdf_path)
+        compacted, report = compact_resume_text(raw_text, token_budget)
+        entry = {"file": pdf_path.name, **report}
+        if report["tokens_before"]:
+            entry["reduction_pct"] = round(100 * report["tokens_saved"] / report["tokens_before"], 1)
+
+        if with_scores:
+            raw_scores, compacted_scores = score(raw_text), score(compacted)
+            entry["score_deltas"] = {field: compacted_scores[field] - raw_scores[field] for field in SCORE_FIELDS}
+        files.append(entry)
+
+    if not files:
+        sys.exit(f"No PDFs found in {corpus}")
+
+    summary = {
+        "files": len(files),
+        "token_budget": token_budget,
+        "tokens_before": sum(f["tokens_before"] for f in files),
+        "tokens_after": sum(f["tokens_after"] for f in files),
+        "mean_reduction_pct": round(statistics.mean(f.get("reduction_pct", 0.0) for f in files), 1),
+        "truncated_files": sum(1 for f in files if f["truncated"]),
+    }
+    if with_scores:
+        deltas = [abs(delta) for f in files for delta in f["score_deltas"].values()]
+        summary["max_abs_score_delta"] = max(deltas)
+        summary["mean_abs_score_delta"] = round(statistics.mean(deltas), 2)
+    return {"summary": summary, "files": files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt compaction benchmark")
+    parser.add_argument("--corpus", type=Path, required=True, help="Directory of sample resume PDFs")
+    parser.add_argument("--score", action="store_true", help="Also analyze raw and compacted text and compare scores")
+    parser.add_argument("--budget", type=int, default=PROMPT_TOKEN_BUDGET, help="Prompt token budget")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.score, args.budget)
+    print(json.dumps(results["summary"], indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
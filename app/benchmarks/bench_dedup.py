@@ -0,0 +1,92 @@
+# Near-duplicate detection benchmark: grows the fingerprint tables in steps and times find_duplicate
+# at each size (lookups should stay flat, not grow with the table), and measures recall on lightly
+# edited copies of stored resumes plus the false-positive rate on unrelated ones.
+#
+#   cd app && python -m benchmarks.bench_dedup [--sizes 1000,10000,100000] [--queries 200] [--output out.json]
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.run_suite import latency_summary, setup_environment
+from benchmarks.synthetic_pdfs import COMPANIES, OBJECTS, ROLES, SKILLS, VERBS
+
+
+def synthetic_resume(rng: random.Random, serial: int) -> str:
+    lines = [f"Candidate {serial}", ", ".join(rng.sample(SKILLS, 10))]
+    for _ in range(40):
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} {rng.randint(2000, 2025)}: "
+                     f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} using {', '.join(rng.sample(SKILLS, 3))}")
+    return "\n".join(lines)
+
+
+def edited(rng: random.Random, text: str) -> str:
+    # A re-application: a few lines rewritten, the rest untouched
+    lines = text.splitlines()
+    for index in rng.sample(range(2, len(lines)), 2):
+        lines[index] = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    return "\n".join(lines)
+
+
+def run(sizes: list, queries: int, chunk: int) -> dict:
+    from database import SessionLocal
+    from dedup import find_duplicate, fingerprint, link_duplicates
+    from models import ResumeData
+
+    rng = random.Random(0)
+    texts = []
+    results = []
+    db = SessionLocal()
+    try:
+        for size in sizes:
+            while len(texts) < size:
+                batch = [synthetic_resume(rng, len(texts) + i) for i in range(min(chunk, size - len(texts)))]
+                entries = [ResumeData(filename=f"resume_{len(texts) + i}.pdf") for i in range(len(batch))]
+                db.add_all(entries)
+                db.flush()
+                link_duplicates(db, [(entry.id, None, text, None) for entry, text in zip(entries, batch)])
+                db.commit()
+                texts.extend(batch)
+
+            probes = [(fingerprint(edited(rng, texts[rng.randrange(size)])), True) for _ in range(queries)]
+            probes += [(fingerprint(synthetic_resume(rng, -1 - i)), False) for i in range(queries)]
+            latencies, found, false_positives = [], 0, 0
+            started = time.perf_counter()
+            for fp, is_duplicate in probes:
+                call_started = time.perf_counter()
+                match = find_duplicate(db, fp)
+                latencies.append(time.perf_counter() - call_started)
+                if match is not None:
+                    found += is_duplicate
+                    false_positives += not is_duplicate
+            summary = latency_summary(latencies, time.perf_counter() - started)
+            summary.update({"resumes": size, "recall": round(found / queries, 3),
+                            "false_positive_rate": round(false_positives / queries, 3)})
+            print(f"  {size} resumes: p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms recall={summary['recall']}")
+            results.append(summary)
+    finally:
+        db.close()
+    return {"lookups": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate detection benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Table sizes to measure lookups at")
+    parser.add_argument("--queries", type=int, default=200, help="Duplicate and non-duplicate probes per size")
+    parser.add_argument("--chunk", type=int, default=500, help="Resumes inserted per transaction while growing")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    output = args.output.resolve() if args.output else None
+    setup_environment(Path(tempfile.mkdtemp(prefix="resume_dedup_")), llm_latency=0.0, bcrypt_rounds=4)
+    report = run([int(size) for size in args.sizes.split(",")], args.queries, args.chunk)
+
+    print(json.dumps(report, indent=2))
+    if output:
+        output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Cold-start benchmark: imports `main` in fresh interpreters the way a uvicorn worker does and
+# checks the result against a time budget. Also reports the heaviest imports from `python -X importtime`
+# and fails when a module that should load lazily (Gemini SDK, PDF libraries, fpdf, numpy) is imported.
+#
+#   cd app && python -m benchmarks.bench_startup [--runs 5] [--budget-ms 1500] [--output out.json]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Marker modules that only appear once the heavy library has really been executed
+LAZY_MODULES = ("google.generativeai", "grpc", "pdfplumber", "pdfminer", "pypdfium2", "fpdf", "numpy.linalg",
+                "sentence_transformers")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _env(workdir: str) -> dict:
+    # The database is never contacted at import time, so any URL works; SQLite avoids needing a server
+    return {**os.environ, "DB_URL": f"sqlite:///{workdir}/startup.db"}
+
+
+def cold_start(env: dict) -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=APP_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"Importing main failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def heaviest_imports(env: dict, top: int) -> list:
+    # -X importtime writes "import time: self [us] | cumulative | imported package" lines to stderr
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=APP_DIR, env=env,
+                            capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below their parent; listing those too would count time twice
+        if name.startswith("  "):
+            continue
+        entries.append({"module": name.strip(), "cumulative_ms": round(int(cumulative_us) / 1000, 1)})
+    return sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Median import time budget for main")
+    parser.add_argument("--top", type=int, default=15, help="How many of the heaviest imports to list")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = _env(workdir)
+        cold_start(env)  # Populate __pycache__ so every measured run is a warm-bytecode cold start
+        runs = [cold_start(env) for _ in range(args.runs)]
+        heaviest = heaviest_imports(env, args.top)
+
+    median_ms = statistics.median(run["seconds"] for run in runs) * 1000
+    eagerly_loaded = sorted({name for run in runs for name in run["loaded"]})
+    report = {
+        "runs": args.runs,
+        "median_import_ms": round(median_ms, 1),
+        "max_import_ms": round(max(run["seconds"] for run in runs) * 1000, 1),
+        "budget_ms": args.budget_ms,
+        "within_budget": median_ms <= args.budget_ms,
+        "eagerly_loaded_heavy_modules": eagerly_loaded,
+        "heaviest_imports": heaviest,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if not report["within_budget"] or eagerly_loaded:
+        raise SystemExit("Start-up budget exceeded or a heavy module was imported eagerly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+# Reproducible benchmark and load-test suite. Runs entirely in-process against a temporary SQLite
+# database, the fake LLM backend (configurable latency) and a synthetic PDF corpus:
+#   - microbenchmarks: extract_text_from_pdf per page count, parse_gemini_response, ORM insert
+#   - load test of /analyze_resume/, /users/login and /reports/generate through the ASGI app
+# Every section reports throughput and p50/p95/p99 latency; --baseline compares with an earlier run.
+#
+#   cd app && python -m benchmarks.run_suite [--requests 200] [--concurrency 16] [--llm-latency 0.2]
+#                                              [--pages 1,3,10] [--output run.json] [--baseline old.json]
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def latency_summary(latencies: list, elapsed: float) -> dict:
+    return {
+        "count": len(latencies),
+        "throughput_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def timed(func, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - call_started)
+    return latency_summary(latencies, time.perf_counter() - started)
+
+
+# ==================== ENVIRONMENT ====================
+def setup_environment(workdir: Path, llm_latency: float, bcrypt_rounds: int):
+    # Must run before any app module is imported: they read their configuration at import time
+    os.environ.update({
+        "DB_URL": f"sqlite:///{workdir / 'bench.db'}",
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(llm_latency),
+        "LLM_REQUESTS_PER_MINUTE": "1000000",
+        "LLM_TOKENS_PER_MINUTE": "1000000000",
+        "PRESCORE_ENABLED": "false",  # Every analysis goes through the fake model
+        "SEARCH_INDEX_PATH": str(workdir / "search.db"),
+        "ANALYSIS_JOB_STORE": str(workdir / "jobs.db"),
+        "RESUME_BLOB_ROOT": str(workdir / "blobs"),
+        "VECTOR_INDEX_DIR": str(workdir / "vectors"),
+        "EMBEDDER": "hashing",
+        "BCRYPT_ROUNDS": str(bcrypt_rounds),
+        "SECRET_KEY": "benchmark",
+        "YOUR_GEMINI_API_KEY": "unused",
+    })
+    # Relative upload/report folders land in the workdir; the app directory stays importable
+    sys.path.insert(0, str(APP_DIR))
+    os.chdir(workdir)
+
+    from search_index import init_search_index
+
+    migrate_database(os.environ["DB_URL"])
+    init_search_index()
+
+
+def migrate_database(url: str):
+    # The real Alembic chain, so benchmarks run against the production schema and its backfills
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(APP_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))  # configparser interpolation
+    command.upgrade(config, "head")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ==================== MICROBENCHMARKS ====================
+def bench_extraction(workdir: Path, page_counts: list, iterations: int) -> dict:
+    from analysis_pipeline import extract_text_from_pdf
+    from benchmarks.synthetic_pdfs import generate_resume_pdf
+
+    results = {}
+    for pages in page_counts:
+        path = generate_resume_pdf(workdir / "micro" / f"pages_{pages}.pdf", pages, seed=pages)
+        results[f"{pages}_pages"] = timed(lambda i: extract_text_from_pdf(path), iterations)
+    return results
+
+
+def bench_parsing(iterations: int) -> dict:
+    from analysis_pipeline import parse_gemini_response
+    from llm_client import FakeModel
+
+    strict = FakeModel().response_text
+    # Markdown-fenced output with a trailing comma takes the tolerant path
+    fenced = "```json\n" + strict[:-1] + ",}\n```"
+    return {
+        "strict_json": timed(lambda i: parse_gemini_response(strict), iterations),
+        "fenced_json": timed(lambda i: parse_gemini_response(fenced), iterations),
+    }
+
+
+def bench_orm_insert(rows: int, chunk_size: int) -> dict:
+    from analysis_pipeline import build_resume_entry
+    from analytics import record_ingested
+    from database import SessionLocal
+    from llm_client import FakeModel
+    from llm_output import parse_analysis
+    from skills import store_resume_items
+
+    parsed = parse_analysis(FakeModel().response_text)
+
+    def insert(count: int):
+        db = SessionLocal()
+        try:
+            entries = [build_resume_entry(f"bench_{count}_{i}.pdf", parsed) for i in range(count)]
+            db.add_all(entries)
+            db.flush()
+            ids = [entry.id for entry in entries]
+            store_resume_items(db, [(resume_id, parsed) for resume_id in ids])
+            record_ingested(db, ids)
+            db.commit()
+        finally:
+            db.close()
+
+    single = timed(lambda i: insert(1), rows)
+    chunked = timed(lambda i: insert(chunk_size), max(1, rows // chunk_size))
+    chunked["rows_per_second"] = round(chunked["throughput_per_second"] * chunk_size, 2)
+    single["rows_per_second"] = single["throughput_per_second"]
+    return {"single_row_commit": single, f"chunk_of_{chunk_size}": chunked}
+
+
+# ==================== LOAD TEST ====================
+async def run_load(name: str, make_request, requests: int, concurrency: int) -> dict:
+    latencies, statuses = [], {}
+    next_index = iter(range(requests))
+
+    async def worker():
+        for i in next_index:
+            started = time.perf_counter()
+            try:
+                status = (await make_request(i)).status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = latency_summary(latencies, time.perf_counter() - started)
+    summary["statuses"] = statuses
+    print(f"  {name}: {summary['throughput_per_second']}/s p95={summary['p95_ms']}ms {statuses}")
+    return summary
+
+
+async def load_test(workdir: Path, requests: int, concurrency: int, pages: int) -> dict:
+    import httpx
+    from benchmarks.synthetic_pdfs import generate_resume_pdf
+    from database import SessionLocal
+    from main import app
+    from models import User
+
+    # Distinct PDFs, so every upload misses the analysis cache like a real new resume
+    uploads = [
+        generate_resume_pdf(workdir / "load" / f"resume_{i:05d}.pdf", pages, seed=10_000 + i).read_bytes()
+        for i in range(requests)
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        password = "benchmark-password"
+        await client.post("/users/register", json={"username": "bench", "email": "bench@example.com", "password": password})
+        token = (await client.post("/users/login", json={"identifier": "bench", "password": password})).json()["access_token"]
+        db = SessionLocal()
+        try:
+            user_id = db.query(User.id).filter(User.username == "bench").scalar()
+        finally:
+            db.close()
+        # Subscribed, so report generation is never rejected by the free quota
+        await client.post(f"/subscriptions/subscribe/{user_id}")
+        headers = {"Authorization": f"Bearer {token}"}
+
+        return {
+            "analyze_resume": await run_load("analyze_resume", lambda i: client.post(
+                "/analyze_resume/", files={"file": (f"resume_{i:05d}.pdf", uploads[i], "application/pdf")},
+                headers=headers
+            ), requests, concurrency),
+            "users_login": await run_load("users_login", lambda i: client.post(
+                "/users/login", json={"identifier": "bench", "password": password}
+            ), requests, concurrency),
+            "reports_generate": await run_load("reports_generate", lambda i: client.post(
+                f"/reports/generate/{user_id}",
+                json={"score": i % 101, "strengths": ["Python", f"Project {i}"], "weaknesses": ["Cloud"]},
+                headers=headers
+            ), requests, concurrency),
+        }
+
+
+# ==================== COMPARISON ====================
+def compare(baseline: dict, current: dict) -> dict:
+    # Percent change of throughput and p95 for every section present in both runs
+    changes = {}
+    for group in ("micro", "load"):
+        for section, benches in current.get(group, {}).items():
+            for bench, result in (benches.items() if "count" not in benches else [(None, benches)]):
+                old = baseline.get(group, {}).get(section, {})
+                old = old.get(bench, {}) if bench is not None else old
+                key = ".".join(part for part in (group, section, bench) if part)
+                for metric in ("throughput_per_second", "p95_ms"):
+                    if old.get(metric) and result.get(metric) is not None:
+                        changes[f"{key}.{metric}"] = round((result[metric] - old[metric]) / old[metric] * 100, 1)
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark and load-test suite")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per load-tested endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake Gemini latency in seconds")
+    parser.add_argument("--pages", default="1,3,10", help="Page counts for the extraction microbenchmark")
+    parser.add_argument("--load-pages", type=int, default=2, help="Pages per uploaded PDF in the load test")
+    parser.add_argument("--iterations", type=int, default=50, help="Iterations per microbenchmark")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    output = args.output.resolve() if args.output else None
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+
+    workdir = Path(tempfile.mkdtemp(prefix="resume_bench_"))
+    setup_environment(workdir, args.llm_latency, args.bcrypt_rounds)
+
+    results = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: str(value) for key, value in vars(args).items()},
+        },
+        "micro": {},
+    }
+
+    print("Microbenchmarks")
+    results["micro"]["extract_text_from_pdf"] = bench_extraction(
+        workdir, [int(p) for p in args.pages.split(",")], args.iterations
+    )
+    results["micro"]["parse_gemini_response"] = bench_parsing(args.iterations * 20)
+    results["micro"]["orm_insert"] = bench_orm_insert(args.iterations * 4, 50)
+
+    if not args.skip_load:
+        print("Load test")
+        results["load"] = asyncio.run(load_test(workdir, args.requests, args.concurrency, args.load_pages))
+
+    from password_hashing import shutdown_hashing_pool
+    from pdf_extraction import shutdown_pool
+    from report_rendering import shutdown_render_pool
+    shutdown_pool()
+    shutdown_hashing_pool()
+    shutdown_render_pool()
+
+    if baseline:
+        results["change_vs_baseline_percent"] = compare(baseline, results)
+
+    print(json.dumps(results, indent=2))
+    if output:
+        output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
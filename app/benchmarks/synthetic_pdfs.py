@@ -0,0 +1,85 @@
+# Generates synthetic resume PDFs with fpdf: deterministic for a given seed, with a configurable
+# number of pages, so benchmark runs see the same corpus every time.
+#
+#   cd app && python -m benchmarks.synthetic_pdfs --out corpus/ [--count 50] [--pages 2] [--seed 0]
+import argparse
+import random
+from pathlib import Path
+
+FIRST_NAMES = ["Asha", "Ravi", "Maya", "Jon", "Lena", "Omar", "Priya", "Tomas", "Mei", "Kofi"]
+LAST_NAMES = ["Sharma", "Patel", "Okafor", "Novak", "Garcia", "Kim", "Haddad", "Silva", "Chen", "Mensah"]
+SKILLS = [
+    "Python", "FastAPI", "SQLAlchemy", "MySQL", "PostgreSQL", "Docker", "Kubernetes", "AWS", "GCP", "Redis",
+    "React", "TypeScript", "Go", "Java", "Spark", "Airflow", "Terraform", "CI/CD pipelines", "Machine learning",
+    "Pandas", "NumPy", "Kafka", "GraphQL", "Linux", "Git",
+]
+ROLES = ["Backend Engineer", "Data Engineer", "Software Engineer", "Platform Engineer", "ML Engineer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries", "Wayne Tech"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Maintained", "Scaled"]
+OBJECTS = [
+    "a REST API serving 2M requests per day", "the nightly ETL pipeline", "the payments service",
+    "an internal analytics dashboard", "the CI/CD workflow", "a recommendation model",
+    "the search indexing job", "the customer onboarding flow",
+]
+
+
+def _bullet(rng: random.Random) -> str:
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {', '.join(rng.sample(SKILLS, 2))}."
+
+
+def generate_resume_pdf(path: Path, pages: int = 1, seed: int = 0) -> Path:
+    from fpdf import FPDF
+
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=False)
+    for page in range(pages):
+        pdf.add_page()
+        pdf.set_font("Arial", "B", 16)
+        if page == 0:
+            pdf.cell(0, 10, name, ln=True)
+            pdf.set_font("Arial", "", 11)
+            pdf.cell(0, 7, f"{name.lower().replace(' ', '.')}{seed}@gmail.com | +1 555 {seed % 10000:04d}", ln=True)
+            pdf.cell(0, 7, rng.choice(ROLES), ln=True)
+            pdf.ln(4)
+            pdf.set_font("Arial", "B", 13)
+            pdf.cell(0, 8, "Skills", ln=True)
+            pdf.set_font("Arial", "", 11)
+            pdf.multi_cell(0, 6, ", ".join(rng.sample(SKILLS, rng.randint(6, 12))))
+        else:
+            pdf.cell(0, 10, f"{name} - page {page + 1}", ln=True)
+
+        pdf.set_font("Arial", "B", 13)
+        pdf.cell(0, 8, "Experience", ln=True)
+        pdf.set_font("Arial", "", 11)
+        for _ in range(3):
+            pdf.cell(0, 7, f"{rng.choice(ROLES)}, {rng.choice(COMPANIES)} ({rng.randint(2012, 2025)})", ln=True)
+            for _ in range(rng.randint(3, 5)):
+                pdf.multi_cell(0, 6, _bullet(rng))
+            pdf.ln(2)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pdf.output(str(path))
+    return path
+
+
+def generate_corpus(out_dir: Path, count: int, pages: int = 1, seed: int = 0) -> list:
+    return [generate_resume_pdf(out_dir / f"resume_{seed + i:05d}.pdf", pages, seed + i) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic resume PDF generator")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.out, args.count, args.pages, args.seed)
+    print(f"Wrote {len(paths)} PDFs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
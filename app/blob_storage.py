@@ -0,0 +1,97 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import ResumeFile
+
+# ==================== BLOB STORAGE CONFIGURATION ====================
+BLOB_ROOT = Path(os.getenv("RESUME_BLOB_ROOT", os.path.join("uploaded_resumes", "blobs")))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+CONTENT_HASH_RE = re.compile(r"[0-9a-f]{64}")
+
+os.makedirs(BLOB_ROOT / "tmp", exist_ok=True)
+
+
+def blob_path_for(content_hash: str) -> Path:
+    # Two levels of sharding keep directory sizes small: ab/cd/abcd....pdf
+    return BLOB_ROOT / content_hash[:2] / content_hash[2:4] / f"{content_hash}.pdf"
+
+
+def write_blob(fileobj, max_bytes: int = MAX_UPLOAD_BYTES):
+    # Streams fileobj to a temp file in chunks, hashing as it goes; returns (blob_path, content_hash, size)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_ROOT / "tmp", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"File exceeds the {max_bytes} byte upload limit")
+                digest.update(chunk)
+                out.write(chunk)
+
+        content_hash = digest.hexdigest()
+        blob_path = blob_path_for(content_hash)
+        if blob_path.exists():
+            # Identical content is already stored once
+            os.remove(tmp_path)
+        else:
+            os.makedirs(blob_path.parent, exist_ok=True)
+            os.replace(tmp_path, blob_path)
+        return blob_path, content_hash, size
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def index_filename(db: Session, filename: str, content_hash: str, size: int):
+    # Single upsert: concurrent uploads of the same filename cannot race into a duplicate-key error
+    values = {"filename": filename, "content_hash": content_hash, "size": size, "uploaded_at": datetime.utcnow()}
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    statement = dialect_insert(ResumeFile).values(values)
+    updates = {name: value for name, value in values.items() if name != "filename"}
+    if dialect == "mysql":
+        statement = statement.on_duplicate_key_update(updates)
+    else:
+        statement = statement.on_conflict_do_update(index_elements=["filename"], set_=updates)
+    db.execute(statement)
+    db.commit()
+
+
+def resume_url(filename: str, content_hash: str) -> str:
+    # Pinned to the uploaded content: a later upload under the same filename never changes what this URL serves
+    return f"http://localhost:8000/resumes/{quote(filename)}?version={content_hash}"
+
+
+def versioned_blob_path(content_hash: str):
+    # None unless the value is a well-formed SHA-256, so a crafted version cannot escape BLOB_ROOT
+    if not CONTENT_HASH_RE.fullmatch(content_hash):
+        return None
+    return blob_path_for(content_hash)
+
+
+async def resolve_filename(db: AsyncSession, filename: str):
+    content_hash = await db.scalar(select(ResumeFile.content_hash).where(ResumeFile.filename == filename))
+    if content_hash is None:
+        return None
+    return blob_path_for(content_hash)
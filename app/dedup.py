@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from lazy_imports import lazy_import
+from models import ResumeFingerprint, ResumeLshBucket
+from prescoring import EMAIL_RE, PHONE_RE
+
+np = lazy_import("numpy")
+
+# ==================== DEDUP CONFIGURATION ====================
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", 128))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", 16))  # 16 bands of 8 rows: candidates from ~0.7 Jaccard upwards
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", 5))  # Words per shingle
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.8))
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", 50))  # Caps work on crowded buckets (shared templates)
+# Near-duplicates at or above this similarity get the earlier analysis instead of a new Gemini call
+DEDUP_REUSE_ANALYSIS = os.getenv("DEDUP_REUSE_ANALYSIS", "false").lower() == "true"
+DEDUP_REUSE_THRESHOLD = float(os.getenv("DEDUP_REUSE_THRESHOLD", 0.9))
+
+if DEDUP_NUM_PERM % DEDUP_BANDS:
+    raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+ROWS_PER_BAND = DEDUP_NUM_PERM // DEDUP_BANDS
+
+MERSENNE_PRIME = (1 << 31) - 1  # a * x stays below 2**62, so the permutations never overflow uint64
+WORD_RE = re.compile(r"[a-z0-9]+")
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+logger = logging.getLogger(__name__)
+
+_permutations = None
+
+
+# ==================== FINGERPRINTS ====================
+def normalize_email(value) -> str | None:
+    if not value:
+        return None
+    match = EMAIL_RE.search(str(value).lower())
+    if match is None:
+        return None
+    local, _, domain = match.group(0).strip(".").rpartition("@")
+    # Gmail ignores dots and +tags, so j.doe+jobs@gmail.com is the same inbox as jdoe@gmail.com
+    if domain in GMAIL_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"[:100] if local else None
+
+
+def normalize_phone(value) -> str | None:
+    digits = re.sub(r"\D", "", str(value or ""))
+    if len(digits) < 7 or len(set(digits)) == 1:  # Too short, or a placeholder like 0000000000
+        return None
+    # The last ten digits, so "+1 (555) 010-2030" and "555 010 2030" match
+    return digits[-10:]
+
+
+def _permutation_params():
+    # Fixed seed: every worker must produce the same signature for the same text
+    global _permutations
+    if _permutations is None:
+        rng = np.random.default_rng(20261017)
+        _permutations = (
+            rng.integers(1, MERSENNE_PRIME, DEDUP_NUM_PERM, dtype=np.uint64)[:, None],
+            rng.integers(0, MERSENNE_PRIME, DEDUP_NUM_PERM, dtype=np.uint64)[:, None],
+        )
+    return _permutations
+
+
+def minhash_signature(text: str):
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    size = min(DEDUP_SHINGLE_SIZE, len(words))
+    shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    values = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") % MERSENNE_PRIME
+         for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    a, b = _permutation_params()
+    return ((a * values[None, :] + b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature) -> list:
+    # One key per band; band index and shape are hashed in so keys never collide across bands or configs
+    keys = []
+    for band in range(DEDUP_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8, person=f"{band}:{ROWS_PER_BAND}".encode()).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def fingerprint(text: str = None, parsed_data: dict = None) -> dict:
+    # Identifiers from the analysis win; the regexes over the text cover lookups made before Gemini runs
+    info = (parsed_data or {}).get("candidate_info") or {}
+    email = normalize_email(info.get("gmail")) or (normalize_email(text) if text else None)
+    phone = normalize_phone(info.get("phone"))
+    if phone is None and text:
+        phone = next((p for p in map(normalize_phone, PHONE_RE.findall(text)) if p), None)
+    return {"signature": minhash_signature(text) if text else None, "email": email, "phone": phone}
+
+
+def _similarity(signature, stored: bytes):
+    if signature is None or stored is None or len(stored) != signature.nbytes:
+        return None
+    return float(np.mean(np.frombuffer(stored, dtype=np.uint32) == signature))
+
+
+# ==================== LOOKUP ====================
+def _match(row, reason: str, similarity):
+    return {
+        "candidate_id": row.candidate_id, "resume_id": row.resume_id, "content_hash": row.content_hash,
+        "reason": reason, "similarity": similarity, "signature": row.signature,
+    }
+
+
+def find_duplicate(db: Session, fp: dict, content_hash: str = None):
+    # Every lookup is an index seek (content hash, identifier, or LSH bucket), never a scan of resume_data
+    columns = (ResumeFingerprint.resume_id, ResumeFingerprint.candidate_id, ResumeFingerprint.content_hash,
+               ResumeFingerprint.signature)
+
+    if content_hash:
+        row = db.execute(select(*columns).where(ResumeFingerprint.content_hash == content_hash).limit(1)).first()
+        if row is not None:
+            return _match(row, "content", 1.0)
+
+    # Exact identifier match links the candidate even when the CV was substantially rewritten;
+    # the newest version is the one most likely to resemble the new upload
+    for reason, column in (("email", ResumeFingerprint.email), ("phone", ResumeFingerprint.phone)):
+        if fp[reason]:
+            row = db.execute(
+                select(*columns).where(column == fp[reason]).order_by(ResumeFingerprint.resume_id.desc()).limit(1)
+            ).first()
+            if row is not None:
+                return _match(row, reason, _similarity(fp["signature"], row.signature))
+
+    if fp["signature"] is None:
+        return None
+    candidate_ids = db.execute(
+        select(ResumeLshBucket.resume_id).where(ResumeLshBucket.bucket.in_(band_keys(fp["signature"])))
+        .distinct().limit(DEDUP_MAX_CANDIDATES)
+    ).scalars().all()
+    if not candidate_ids:
+        return None
+
+    # LSH only proposes candidates; the signature estimate of Jaccard similarity decides
+    best, best_similarity = None, DEDUP_SIMILARITY_THRESHOLD
+    for row in db.execute(select(*columns).where(ResumeFingerprint.resume_id.in_(candidate_ids))):
+        similarity = _similarity(fp["signature"], row.signature)
+        if similarity is not None and similarity >= best_similarity:
+            best, best_similarity = row, similarity
+    return _match(best, "minhash", best_similarity) if best is not None else None
+
+
+def reusable_match(match) -> bool:
+    return (DEDUP_REUSE_ANALYSIS and match is not None and match["similarity"] is not None
+            and match["similarity"] >= DEDUP_REUSE_THRESHOLD)
+
+
+# ==================== STORAGE ====================
+def record_fingerprint(db: Session, resume_id: int, content_hash: str, fp: dict, match=None):
+    # Adds the rows in the caller's transaction; the new resume joins the matched candidate or starts its own
+    signature = fp["signature"]
+    if signature is None and match is not None and match["reason"] == "content":
+        signature = np.frombuffer(match["signature"], dtype=np.uint32) if match["signature"] else None
+
+    db.add(ResumeFingerprint(
+        resume_id=resume_id,
+        candidate_id=match["candidate_id"] if match else resume_id,
+        duplicate_of=match["resume_id"] if match else None,
+        match_reason=match["reason"] if match else None,
+        similarity=match["similarity"] if match else None,
+        content_hash=content_hash,
+        email=fp["email"],
+        phone=fp["phone"],
+        signature=signature.tobytes() if signature is not None else None,
+    ))
+    if signature is not None:
+        db.execute(insert(ResumeLshBucket), [{"bucket": key, "resume_id": resume_id} for key in band_keys(signature)])
+    db.flush()
+
+
+def link_duplicates(db: Session, entries) -> list:
+    # entries: iterable of (resume_id, content_hash, text, parsed_data), in ingest order so later
+    # rows of the same batch can match earlier ones. Returns the match (or None) per entry.
+    matches = []
+    for resume_id, content_hash, text, parsed_data in entries:
+        fp = fingerprint(text, parsed_data)
+        match = find_duplicate(db, fp, content_hash)
+        record_fingerprint(db, resume_id, content_hash, fp, match)
+        matches.append(match)
+    return matches
+
+
+def public_match(match) -> dict | None:
+    if match is None:
+        return None
+    similarity = round(match["similarity"], 3) if match["similarity"] is not None else None
+    return {"candidate_id": match["candidate_id"], "matched_resume_id": match["resume_id"],
+            "reason": match["reason"], "similarity": similarity}
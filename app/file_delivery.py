@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from cachetools import LRUCache, TTLCache
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+
+# ==================== FILE DELIVERY CONFIGURATION ====================
+# Served files are content-addressed and never rewritten in place, so stat results can be
+# reused for a while instead of hitting the filesystem on every download
+STAT_CACHE_TTL_SECONDS = float(os.getenv("STAT_CACHE_TTL_SECONDS", 60))
+STAT_CACHE_SIZE = int(os.getenv("STAT_CACHE_SIZE", 10000))
+PRECOMPRESSED_VARIANTS = os.getenv("PRECOMPRESSED_VARIANTS", "true").lower() == "true"
+PRECOMPRESS_MIN_SAVINGS = float(os.getenv("PRECOMPRESS_MIN_SAVINGS", 0.1))  # Keep a .gz only if it is 10% smaller
+
+_MISSING = object()
+_stat_cache = TTLCache(maxsize=STAT_CACHE_SIZE, ttl=STAT_CACHE_TTL_SECONDS)
+_hash_cache = LRUCache(maxsize=STAT_CACHE_SIZE)  # (path, mtime_ns, size) -> sha256, for files stored by name
+_cache_lock = threading.Lock()
+
+
+def _stat(path: str, cache_missing: bool):
+    # Returns os.stat_result, or _MISSING when the file does not exist
+    try:
+        result = os.stat(path)
+    except FileNotFoundError:
+        result = _MISSING
+        if not cache_missing:
+            return result
+    with _cache_lock:
+        _stat_cache[path] = result
+    return result
+
+
+async def _cached_stat(path: str, cache_missing: bool = False):
+    with _cache_lock:
+        result = _stat_cache.get(path)
+    if result is None:
+        result = await run_in_threadpool(_stat, path, cache_missing)
+    return None if result is _MISSING else result
+
+
+def _hash_file(path: str, stat_result) -> str:
+    key = (path, stat_result.st_mtime_ns, stat_result.st_size)
+    with _cache_lock:
+        digest = _hash_cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _cache_lock:
+            _hash_cache[key] = digest
+    return digest
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def write_precompressed(path: str, variant_path: str = None):
+    # Writes a gzip variant (path.gz by default) when it is meaningfully smaller than the file
+    variant_path = variant_path or f"{path}.gz"
+    size = os.path.getsize(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(variant_path), suffix=".gz.part")
+    try:
+        with open(path, "rb") as src, os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as out:
+            shutil.copyfileobj(src, out)
+        if os.path.getsize(tmp_path) <= size * (1 - PRECOMPRESS_MIN_SAVINGS):
+            os.replace(tmp_path, variant_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def file_response(request: Request, path, content_hash: str = None, media_type: str = "application/pdf",
+                        cache_control: str = "no-cache", headers: dict = None):
+    # FileResponse with a strong content-hash ETag, 304 for If-None-Match, a pre-compressed .gz
+    # variant when one exists, and byte ranges (handled by Starlette for Range / If-Range).
+    # Returns None when the file does not exist.
+    path = str(path)
+    stat_result = await _cached_stat(path)
+    if stat_result is None:
+        return None
+
+    if content_hash is None:
+        # Files stored under their upload name have no hash recorded; compute it once per version
+        content_hash = await run_in_threadpool(_hash_file, path, stat_result)
+
+    response_headers = dict(headers or {})
+    response_headers["Cache-Control"] = cache_control
+    etag = f'"{content_hash}"'
+    serve_path = path
+
+    # Most files have no variant, so a missing .gz is cached too
+    gz_stat = await _cached_stat(f"{path}.gz", cache_missing=True) if PRECOMPRESSED_VARIANTS else None
+    if gz_stat is not None:
+        response_headers["Vary"] = "Accept-Encoding"
+        # Byte ranges always refer to the identity encoding, so ranged requests skip the variant
+        if "range" not in request.headers and _accepts_gzip(request.headers.get("accept-encoding", "")):
+            # Each representation needs its own strong validator
+            etag = f'"{content_hash}-gzip"'
+            serve_path, stat_result = f"{path}.gz", gz_stat
+            response_headers["Content-Encoding"] = "gzip"
+
+    response_headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        response_headers.pop("Content-Encoding", None)
+        response_headers.pop("Content-Disposition", None)
+        return Response(status_code=304, headers=response_headers)
+
+    return FileResponse(serve_path, media_type=media_type, headers=response_headers, stat_result=stat_result)
@@ -0,0 +1,29 @@
+import importlib
+import importlib.util
+
+
+class LazyModule:
+    # Stands in for a module until its first attribute access, which performs a normal import.
+    # Keeps heavy optional libraries (numpy) out of worker start-up until a request needs them.
+    # Unlike importlib.util.LazyLoader (not thread-safe before 3.12), the first touch goes through
+    # importlib.import_module, so concurrent threadpool workers never see a half-initialised module.
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+
+def lazy_import(name: str) -> LazyModule:
+    # Fails at import time, like a regular import, when the module is not installed
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    return LazyModule(name)
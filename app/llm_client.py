@@ -0,0 +1,455 @@
+import hashlib
+import os
+import random
+import threading
+import time
+import types
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# ==================== LLM CLIENT CONFIGURATION ====================
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "fake"
+LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemini-1.5-pro")
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 60))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 1000000))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", 60))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", 0.5))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", 20))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMUnavailableError(LLMError):
+    # Circuit open, rate limit wait exceeded the deadline, or retries exhausted on a transient error
+    pass
+
+
+class LLMTimeoutError(LLMError):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text; good enough for rate limiting
+    return max(1, len(text) // 4)
+
+
+# ==================== RATE LIMITING ====================
+class TokenBucket:
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1, deadline: float = None) -> bool:
+        # Blocks until `amount` tokens are available; False if that would pass the deadline
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._probe = None  # Ticket of the half-open trial call in flight
+        self._probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        # Falsy when the call is rejected, otherwise a ticket the caller hands to end_call on every
+        # exit path. In half-open state exactly one trial call goes through; its result closes or
+        # re-opens the breaker. reset_seconds also bounds a trial whose caller never returns.
+        with self._lock:
+            now = time.monotonic()
+            if self._opened_at is None:
+                return True
+            if now - self._opened_at < self.reset_seconds:
+                return False
+            if self._probe is not None and now - self._probe_started < self.reset_seconds:
+                return False
+            self._probe = ticket = object()
+            self._probe_started = now
+            return ticket
+
+    def end_call(self, ticket):
+        # A trial that ended without an outcome (local timeout, non-retryable error, abandoned
+        # stream) frees the half-open slot, so the next caller probes instead of being rejected
+        with self._lock:
+            if ticket is self._probe:
+                self._probe = self._probe_started = None
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe = self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._probe = self._probe_started = None
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+# ==================== MODELS ====================
+def _gemini_model_factory(model_name: str):
+    # Imported on first use: google.generativeai pulls in grpc and protobuf, which dominate worker start-up
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("YOUR_GEMINI_API_KEY"))
+    return genai.GenerativeModel(model_name)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    # Stand-in for genai.GenerativeModel with configurable latency and failures, for tests and benchmarks.
+    # With stream=True the response arrives in chunk_chars pieces, chunk_latency_seconds apart.
+    def __init__(self, response_text: str = None, latency_seconds: float = 0.0, fail_times: int = 0,
+                 error_factory=None, chunk_chars: int = 16, chunk_latency_seconds: float = 0.0):
+        self.response_text = response_text or (
+            '{"overall_score": 75, "relevance": 80, "skills_fit": 70, "experience_match": 72,'
+            ' "cultural_fit": 78, "strengths": ["Python"], "weaknesses": ["Cloud"],'
+            ' "missing_elements": ["Kubernetes"], "recommendations": ["Add metrics"],'
+            ' "candidate_info": {"name": "Test Candidate", "gmail": "test@example.com", "phone": "0000000000"}}'
+        )
+        self.latency_seconds = latency_seconds
+        self.fail_times = fail_times
+        self.error_factory = error_factory or (lambda: LLMUnavailableError("fake upstream 503"))
+        self.chunk_chars = chunk_chars
+        self.chunk_latency_seconds = chunk_latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, request_options=None, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            should_fail = self.calls <= self.fail_times
+        time.sleep(self.latency_seconds)
+        if should_fail:
+            raise self.error_factory()
+        if stream:
+            return self._stream()
+        return FakeResponse(self.response_text)
+
+    def count_tokens(self, contents, request_options=None):
+        time.sleep(self.latency_seconds)
+        return types.SimpleNamespace(total_tokens=estimate_tokens(str(contents)))
+
+    def _stream(self):
+        for start in range(0, len(self.response_text), self.chunk_chars):
+            if start:
+                time.sleep(self.chunk_latency_seconds)
+            yield FakeResponse(self.response_text[start:start + self.chunk_chars])
+
+
+def _fake_model_factory(model_name: str):
+    return FakeModel(latency_seconds=float(os.getenv("FAKE_LLM_LATENCY_SECONDS", 0.05)),
+                     chunk_latency_seconds=float(os.getenv("FAKE_LLM_CHUNK_LATENCY_SECONDS", 0.0)))
+
+
+MODEL_FACTORIES = {
+    "gemini": _gemini_model_factory,
+    "fake": _fake_model_factory,
+}
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError, LLMUnavailableError)):
+        return True
+    code = getattr(exc, "code", None)
+    try:
+        return int(code) in RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+# ==================== CLIENT ====================
+class LLMClient:
+    def __init__(self, model_factory=None, model_name: str = LLM_MODEL_NAME,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout_seconds: float = LLM_CALL_TIMEOUT_SECONDS,
+                 max_retries: int = LLM_MAX_RETRIES):
+        self.model_factory = model_factory or MODEL_FACTORIES[LLM_BACKEND]
+        self.model_name = model_name
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        # One model instance per name, shared by every request
+        self._models = {}
+        self._models_lock = threading.Lock()
+
+        # prompt hash -> Future of the upstream call already in flight for that prompt
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0,
+            "failures": 0, "rate_limited": 0, "circuit_rejections": 0,
+            "queue_depth": 0, "in_flight": 0,
+        }
+        self._latencies = []
+
+    def _model(self, model_name: str):
+        with self._models_lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._models[model_name] = self.model_factory(model_name)
+            return model
+
+    def warm_up(self):
+        # Builds the default model (and imports its SDK) ahead of the first request, then makes a
+        # token count: a real round trip to the API that checks the key and reachability without
+        # spending generation quota. Raises when the API cannot be reached.
+        self._model(self.model_name).count_tokens("ping", request_options={"timeout": self.timeout_seconds})
+
+    def _count(self, key: str, amount: int = 1):
+        with self._metrics_lock:
+            self._metrics[key] += amount
+
+    def generate(self, prompt: str, model_name: str = None, timeout: float = None, **generate_kwargs) -> str:
+        self._count("requests")
+        model_name = model_name or self.model_name
+        key = hashlib.sha256(f"{model_name}\0{prompt}".encode()).hexdigest()
+
+        # Identical prompts already in flight share one upstream call
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            self._count("coalesced")
+            try:
+                return future.result(timeout=timeout or self.timeout_seconds)
+            except FutureTimeoutError:
+                # Same error the leader raises on its own deadline, so callers map it to a 504 too
+                self._count("failures")
+                raise LLMTimeoutError("LLM call deadline exceeded waiting for a coalesced call")
+
+        try:
+            text = self._call_with_retries(prompt, model_name, timeout or self.timeout_seconds, generate_kwargs)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _call_with_retries(self, prompt: str, model_name: str, timeout: float, generate_kwargs: dict) -> str:
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            ticket = self.breaker.allow()
+            if not ticket:
+                self._count("circuit_rejections")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+
+            try:
+                return self._call_once(prompt, model_name, deadline, generate_kwargs)
+            except LLMTimeoutError:
+                # Our own deadline ran out locally; that says nothing about upstream health
+                self._count("failures")
+                raise
+            except Exception as e:
+                retryable = _is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                if not retryable or attempt >= self.max_retries:
+                    self._count("failures")
+                    if retryable:
+                        raise LLMUnavailableError(f"LLM unavailable after {attempt + 1} attempts: {e}") from e
+                    raise
+            finally:
+                self.breaker.end_call(ticket)
+
+            # Full-jitter exponential backoff, never sleeping past the deadline
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                self._count("failures")
+                raise LLMTimeoutError("LLM call deadline exceeded while retrying")
+            self._count("retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def _acquire(self, prompt: str, deadline: float):
+        # Rate limits and a connection slot; the caller releases the slot
+        self._count("queue_depth")
+        try:
+            if not (self.request_bucket.acquire(1, deadline) and
+                    self.token_bucket.acquire(estimate_tokens(prompt), deadline)):
+                self._count("rate_limited")
+                raise LLMTimeoutError("LLM rate limit wait exceeded the call deadline")
+
+            if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                raise LLMTimeoutError("Timed out waiting for a free LLM connection")
+        finally:
+            self._count("queue_depth", -1)
+
+    def _call_once(self, prompt: str, model_name: str, deadline: float, generate_kwargs: dict) -> str:
+        self._acquire(prompt, deadline)
+        self._count("in_flight")
+        started = time.perf_counter()
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeoutError("LLM call deadline exceeded")
+            self._count("upstream_calls")
+            response = self._model(model_name).generate_content(
+                prompt, request_options={"timeout": remaining}, **generate_kwargs
+            )
+            self.breaker.record_success()
+            return response.text
+        finally:
+            self._count("in_flight", -1)
+            self._slots.release()
+            self._record_latency(time.perf_counter() - started)
+
+    def generate_stream(self, prompt: str, model_name: str = None, timeout: float = None, **generate_kwargs):
+        # Yields text chunks as the model produces them. Streams are not coalesced, and a failed
+        # call is only retried while nothing has been yielded yet.
+        self._count("requests")
+        model_name = model_name or self.model_name
+        deadline = time.monotonic() + (timeout or self.timeout_seconds)
+        attempt = 0
+        while True:
+            ticket = self.breaker.allow()
+            if not ticket:
+                self._count("circuit_rejections")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+
+            yielded = False
+            try:
+                for text in self._stream_once(prompt, model_name, deadline, generate_kwargs):
+                    yielded = True
+                    yield text
+                return
+            except LLMTimeoutError:
+                self._count("failures")
+                raise
+            except Exception as e:
+                retryable = _is_retryable(e)
+                if retryable:
+                    self.breaker.record_failure()
+                if yielded or not retryable or attempt >= self.max_retries:
+                    self._count("failures")
+                    if retryable:
+                        raise LLMUnavailableError(f"LLM stream failed after {attempt + 1} attempts: {e}") from e
+                    raise
+            finally:
+                self.breaker.end_call(ticket)
+
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                self._count("failures")
+                raise LLMTimeoutError("LLM call deadline exceeded while retrying")
+            self._count("retries")
+            time.sleep(delay)
+            attempt += 1
+
+    def _stream_once(self, prompt: str, model_name: str, deadline: float, generate_kwargs: dict):
+        self._acquire(prompt, deadline)
+        self._count("in_flight")
+        started = time.perf_counter()
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMTimeoutError("LLM call deadline exceeded")
+            self._count("upstream_calls")
+            response = self._model(model_name).generate_content(
+                prompt, stream=True, request_options={"timeout": remaining}, **generate_kwargs
+            )
+            for chunk in response:
+                if time.monotonic() > deadline:
+                    raise LLMTimeoutError("LLM stream deadline exceeded")
+                if chunk.text:
+                    yield chunk.text
+            self.breaker.record_success()
+        finally:
+            # Also runs when the consumer stops early (client disconnect), so the slot is never leaked
+            self._count("in_flight", -1)
+            self._slots.release()
+            self._record_latency(time.perf_counter() - started)
+
+    def _record_latency(self, seconds: float):
+        with self._metrics_lock:
+            self._latencies.append(seconds)
+            if len(self._latencies) > 1000:
+                del self._latencies[:500]
+
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+            latencies = sorted(self._latencies)
+        stats["circuit_state"] = self.breaker.state
+        if latencies:
+            stats["latency_p50_seconds"] = latencies[len(latencies) // 2]
+            stats["latency_p95_seconds"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return stats
+
+
+llm_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    global llm_client
+    with _client_lock:
+        if llm_client is None:
+            llm_client = LLMClient()
+        return llm_client
+
+
+def set_llm_client(client: LLMClient):
+    # Lets tests and benchmarks swap in a client backed by FakeModel
+    global llm_client
+    with _client_lock:
+        llm_client = client
@@ -0,0 +1,209 @@
+import logging
+import os
+import re
+import threading
+from typing import Optional
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError
+
+from llm_client import get_llm_client
+
+# ==================== STRUCTURED OUTPUT CONFIGURATION ====================
+STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+LLM_REPAIR_MODEL_NAME = os.getenv("LLM_REPAIR_MODEL_NAME")  # Defaults to the analysis model
+LLM_REPAIR_ENABLED = os.getenv("LLM_REPAIR_ENABLED", "true").lower() == "true"
+
+SCORE_FIELDS = ("overall_score", "relevance", "skills_fit", "experience_match", "cultural_fit")
+LIST_FIELDS = ("strengths", "weaknesses", "missing_elements", "recommendations")
+CANDIDATE_FIELDS = ("name", "gmail", "phone")
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisParseError(Exception):
+    pass
+
+
+# ==================== SCHEMA ====================
+# Mirrors the ResumeData columns; the same field lists drive the Gemini response schema below
+class CandidateInfo(BaseModel):
+    name: Optional[str] = None
+    gmail: Optional[str] = None
+    phone: Optional[str] = None
+
+
+class ResumeAnalysis(BaseModel):
+    overall_score: float = Field(ge=0, le=100)
+    relevance: float = Field(ge=0, le=100)
+    skills_fit: float = Field(ge=0, le=100)
+    experience_match: float = Field(ge=0, le=100)
+    cultural_fit: float = Field(ge=0, le=100)
+    strengths: list[str] = []
+    weaknesses: list[str] = []
+    missing_elements: list[str] = []
+    recommendations: list[str] = []
+    candidate_info: CandidateInfo = CandidateInfo()
+
+
+RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        **{field: {"type": "NUMBER"} for field in SCORE_FIELDS},
+        **{field: {"type": "ARRAY", "items": {"type": "STRING"}} for field in LIST_FIELDS},
+        "candidate_info": {
+            "type": "OBJECT",
+            "properties": {field: {"type": "STRING", "nullable": True} for field in CANDIDATE_FIELDS},
+        },
+    },
+    "required": [*SCORE_FIELDS, *LIST_FIELDS, "candidate_info"],
+}
+
+
+def generation_config() -> dict:
+    # Passed to generate_content: Gemini then emits bare JSON that follows RESPONSE_SCHEMA
+    if not STRUCTURED_OUTPUT_ENABLED:
+        return {}
+    return {"generation_config": {"response_mime_type": "application/json", "response_schema": RESPONSE_SCHEMA}}
+
+
+# ==================== METRICS ====================
+_stats = {
+    "responses": 0,
+    "parsed_strict": 0,  # Valid JSON as returned
+    "parsed_tolerant": 0,  # Needed fence / trailing-comma cleanup
+    "repair_attempts": 0,
+    "repaired": 0,
+    "wasted_calls": 0,  # Analysis responses thrown away because even the repair failed
+}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def parsing_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ==================== PARSING ====================
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def _decode(text: str):
+    try:
+        return orjson.loads(text), False
+    except orjson.JSONDecodeError:
+        pass
+
+    # Free-form output: drop a Markdown fence, keep the outermost object, remove trailing commas
+    candidate = _FENCE.sub("", text)
+    start, end = candidate.find("{"), candidate.rfind("}")
+    if start != -1 and end > start:
+        candidate = candidate[start:end + 1]
+    return orjson.loads(_TRAILING_COMMA.sub(r"\1", candidate)), True
+
+
+def _decode_and_validate(text: str) -> dict:
+    data, tolerant = _decode(text)
+    result = ResumeAnalysis.model_validate(data).model_dump()
+    _count("parsed_tolerant" if tolerant else "parsed_strict")
+    return result
+
+
+def _repair_prompt(text: str, error: Exception) -> str:
+    # Only the broken output goes back to the model, never the resume, so the repair stays cheap
+    return (
+        "The JSON below does not match the required schema. Return only the corrected JSON object,"
+        " keeping every value that is already valid.\n"
+        f"Schema: {orjson.dumps(RESPONSE_SCHEMA).decode()}\n"
+        f"Errors: {str(error)[:1000]}\n"
+        f"JSON:\n{text}"
+    )
+
+
+class IncrementalFieldParser:
+    # Fed the streamed response chunk by chunk; returns each top-level key of the JSON object as soon
+    # as its value is complete. Values are unvalidated previews: parse_analysis on the full text stays
+    # the source of truth. Text before the opening brace (e.g. a Markdown fence) is ignored.
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect = "key"  # key -> colon -> value -> key ...
+        self._start = None
+        self._key = None
+
+    def feed(self, chunk: str) -> list:
+        self._text += chunk
+        fields = []
+        while self._pos < len(self._text):
+            char = self._text[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = orjson.loads(self._text[self._start:self._pos + 1])
+                        self._expect = "colon"
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._start = self._pos
+            elif char in "{[":
+                self._depth += 1
+            elif char in ",}]" and self._depth == 1 and self._expect == "value":
+                # The top-level value ends at the comma or the closing brace of the object
+                fields.append(self._complete_field())
+                if char == "}":
+                    self._depth = 0
+            elif char in "}]":
+                self._depth = max(0, self._depth - 1)
+            elif char == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+                self._start = self._pos + 1
+            self._pos += 1
+        return [field for field in fields if field is not None]
+
+    def _complete_field(self):
+        self._expect = "key"
+        try:
+            return self._key, orjson.loads(self._text[self._start:self._pos])
+        except orjson.JSONDecodeError:
+            return None
+
+
+def parse_analysis(response_text: str) -> dict:
+    # Returns the validated analysis dict; one repair call is made before giving up
+    _count("responses")
+    try:
+        return _decode_and_validate(response_text)
+    except (orjson.JSONDecodeError, ValidationError) as e:
+        error = e
+
+    if not LLM_REPAIR_ENABLED:
+        _count("wasted_calls")
+        raise AnalysisParseError(str(error))
+
+    _count("repair_attempts")
+    logger.warning("Analysis response failed validation, attempting repair: %s", str(error)[:200])
+    try:
+        repaired = get_llm_client().generate(
+            _repair_prompt(response_text, error), model_name=LLM_REPAIR_MODEL_NAME, **generation_config()
+        )
+        result = _decode_and_validate(repaired)
+    except Exception as e:
+        _count("wasted_calls")
+        raise AnalysisParseError(str(e)) from e
+
+    _count("repaired")
+    return result
@@ -1,125 +1,138 @@
-import json
-import os
-import pdfplumber
-import google.generativeai as genai
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
+
+# Before the app modules are imported: they read their configuration at import time
+load_dotenv()
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pathlib import Path
-from database import get_db, engine, Base
-from models import ResumeData
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_async_db
+from analysis_cache import cache_stats
+from analysis_pipeline import UPLOAD_FOLDER, save_upload, run_analysis
+from analysis_stream import stream_analysis
+from blob_storage import resolve_filename, resume_url, versioned_blob_path
+from file_delivery import file_response
+from llm_client import get_llm_client
+from llm_output import parsing_stats
+from metrics import RequestMetricsMiddleware, configure_logging, metrics_payload
+from quota import charge_analysis_attempt, refund_analysis_attempt
+from startup import lifespan
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from routes import report_routes, subscription_routes, user_routes
+from routes import report_routes, subscription_routes, user_routes, job_routes, batch_routes, resume_routes, search_routes, match_routes, skill_routes, analytics_routes, health_routes
 from fastapi.openapi.utils import get_openapi
 
 # ==================== FASTAPI APP CONFIGURATION ====================
+configure_logging()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Include your routes
 app.include_router(report_routes.router, prefix="/reports", tags=["Reports"])
 app.include_router(subscription_routes.router, prefix="/subscriptions", tags=["Subscriptions"])
 app.include_router(user_routes.router, prefix="/users", tags=["Users"])
+app.include_router(job_routes.router, prefix="/analyze_resume/jobs", tags=["Resume Analysis"])
+app.include_router(batch_routes.router, prefix="/analyze_resume/batch", tags=["Resume Analysis"])
+app.include_router(resume_routes.router, prefix="/resumes", tags=["Resumes"])
+app.include_router(search_routes.router, prefix="/search", tags=["Resumes"])
+app.include_router(match_routes.router, prefix="/match", tags=["Resumes"])
+app.include_router(skill_routes.router, prefix="/skills", tags=["Resumes"])
+app.include_router(analytics_routes.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(health_routes.router, prefix="/health", tags=["Health"])
 
 # ==================== ANALYZE RESUME ENDPOINT ====================
-UPLOAD_FOLDER = "uploaded_resumes"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)  # Ensure folder exists
-
-def extract_text_from_pdf(pdf_file) -> str:
-    try:
-        with pdfplumber.open(pdf_file) as pdf:
-            text = " ".join(page.extract_text() or "" for page in pdf.pages)
-        if not text.strip():
-            raise ValueError("No readable text found in the PDF.")
-        return text
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to extract text: {str(e)}")
-
-def analyze_resume_with_gemini(text: str) -> str:
-    prompt = (
-        "Analyze this resume and provide details in JSON format:\n"
-        "{"
-        '"overall_score": <numeric value>,\n'
-        '"relevance": <numeric value>,\n'
-        '"skills_fit": <numeric value>,\n'
-        '"experience_match": <numeric value>,\n'
-        '"cultural_fit": <numeric value>,\n'
-        '"strengths": <list of key strengths>,\n'
-        '"weaknesses": <list of key weaknesses>,\n'
-        '"missing_elements": <list of missing qualifications>,\n'
-        '"recommendations": <list of suggestions>,\n'
-        '"candidate_info": { "name": "<candidate name>", "gmail": "<email>", "phone": "<phone>" }\n'
-        "}"
-        f"\nResume text:\n{text}"
-    )
-
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Gemini API error: {str(e)}")
-
-def parse_gemini_response(response_text: str) -> dict:
-    cleaned_response = response_text.strip().strip("```").replace("json", "").strip()
-    try:
-        return json.loads(cleaned_response)
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"Parsing error: {str(e)}")
-
 @app.post("/analyze_resume/", tags=["Resume Analysis"])
-async def analyze_resume(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def analyze_resume(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    quota=Depends(charge_analysis_attempt)
+):
     if not file.filename.endswith(".pdf"):
+        await refund_analysis_attempt(quota)
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
     try:
-        file_path = Path(UPLOAD_FOLDER) / file.filename
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
-
-        resume_url = f"http://localhost:8000/resumes/{file.filename}"
-
-        text = extract_text_from_pdf(file_path)
-        analyzed_data = analyze_resume_with_gemini(text)
-        parsed_data = parse_gemini_response(analyzed_data)
-
-        resume_entry = ResumeData(
-            filename=file.filename,
-            overall_score=float(parsed_data["overall_score"]),
-            relevance=float(parsed_data["relevance"]),
-            skills_fit=float(parsed_data["skills_fit"]),
-            experience_match=float(parsed_data["experience_match"]),
-            cultural_fit=float(parsed_data["cultural_fit"]),
-            strengths=", ".join(parsed_data.get("strengths", [])),
-            weaknesses=", ".join(parsed_data.get("weaknesses", [])),
-            missing_elements=", ".join(parsed_data.get("missing_elements", [])),
-            recommendations=", ".join(parsed_data.get("recommendations", [])),
-            candidate_name=parsed_data["candidate_info"]["name"],
-            candidate_gmail=parsed_data["candidate_info"]["gmail"],
-            candidate_phone=parsed_data["candidate_info"]["phone"]
-        )
-
-        db.add(resume_entry)
-        db.commit()
-        db.refresh(resume_entry)
-
-        parsed_data["resume_url"] = resume_url
+        file_path, content_hash = await run_in_threadpool(save_upload, db, file)
+        # Extraction, Gemini and the DB commit all block, so keep them off the event loop
+        resume_entry, parsed_data = await run_in_threadpool(run_analysis, db, file_path, file.filename, content_hash)
+
+        parsed_data["resume_url"] = resume_url(file.filename, content_hash)
         return {"message": "Resume analyzed successfully", "data": parsed_data}
 
     except HTTPException as e:
         db.rollback()
+        await refund_analysis_attempt(quota)
         raise e
     except Exception as e:
         db.rollback()
+        await refund_analysis_attempt(quota)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
+@app.post("/analyze_resume/stream", tags=["Resume Analysis"])
+async def analyze_resume_stream(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    quota=Depends(charge_analysis_attempt)
+):
+    # Same analysis as /analyze_resume/, reported as Server-Sent Events while it runs (see analysis_stream)
+    if not file.filename.endswith(".pdf"):
+        await refund_analysis_attempt(quota)
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    try:
+        # Stored before the response starts: the upload and the request session are gone once it streams
+        file_path, content_hash = await run_in_threadpool(save_upload, db, file)
+    except Exception as e:
+        db.rollback()
+        await refund_analysis_attempt(quota)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+    return StreamingResponse(
+        stream_analysis(file.filename, file_path, content_hash, on_error=lambda: refund_analysis_attempt(quota)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # Keep proxies from buffering events
+    )
+
+@app.get("/analyze_resume/cache/stats", tags=["Resume Analysis"])
+async def analysis_cache_stats():
+    return cache_stats()
+
+@app.get("/analyze_resume/llm/stats", tags=["Resume Analysis"])
+async def llm_client_stats():
+    return {**get_llm_client().stats(), "parsing": parsing_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
 @app.get("/resumes/{filename}")
-async def get_resume_file(filename: str):
-    file_path = Path(UPLOAD_FOLDER) / filename
-    if file_path.exists():
-        return FileResponse(file_path)
-    raise HTTPException(status_code=404, detail="File not found")
+async def get_resume_file(filename: str, request: Request, version: Optional[str] = None,
+                          db: AsyncSession = Depends(get_async_db)):
+    if version is not None:
+        # URLs handed out with an analysis pin the exact upload, so they can be cached indefinitely
+        file_path = versioned_blob_path(version)
+        response = await file_response(request, file_path, content_hash=version,
+                                       cache_control="public, max-age=31536000, immutable") if file_path else None
+        if response is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        return response
+
+    file_path = await resolve_filename(db, filename)
+    content_hash = file_path.stem if file_path is not None else None  # Blobs are named by their SHA-256
+    if file_path is None:
+        # Uploads from before content-addressed storage still live under their original name
+        file_path = Path(UPLOAD_FOLDER) / Path(filename).name
+
+    # A filename can be re-uploaded with new content, so clients revalidate (cheap 304) on every use
+    response = await file_response(request, file_path, content_hash=content_hash)
+    if response is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return response
 
 # ================== SWAGGER UI SECURITY CONFIGURATION ==================
 def custom_openapi():
@@ -147,8 +160,3 @@ app.openapi = custom_openapi
 @app.get("/secure-data", dependencies=[Depends(oauth2_scheme)])
 async def secure_data():
     return {"message": "You have access to secure data."}
-
-# ================= DATABASE INITIALIZATION ==================
-load_dotenv()
-genai.configure(api_key=os.getenv("YOUR_GEMINI_API_KEY"))
-Base.metadata.create_all(bind=engine)
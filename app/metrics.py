@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter as StackCounter
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# ==================== METRICS CONFIGURATION ====================
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", 5))
+PROFILE_SLOW_REQUESTS = os.getenv("PROFILE_SLOW_REQUESTS", "false").lower() == "true"
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", 0.01))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Spans cover everything from a 1 ms cache lookup to a slow Gemini call
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "pipeline_stage_duration_seconds", "Time spent in one pipeline stage", ["stage"], buckets=LATENCY_BUCKETS
+)
+STAGE_ERRORS = Counter("pipeline_stage_errors_total", "Pipeline stages that raised", ["stage"])
+
+request_id_var = ContextVar("request_id", default="-")
+# Per-request stage totals, for the slow request log line; shared with threadpool copies of the context
+_stage_totals = ContextVar("stage_totals", default=None)
+
+logger = logging.getLogger(__name__)
+_UNSAFE_ID_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+
+
+# ==================== LOGGING ====================
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+def configure_logging():
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdFilter())
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+
+# ==================== SAMPLING PROFILER ====================
+class SlowRequestProfiler:
+    # Samples the stacks of threads that are inside a span for a profiled request, and writes them in
+    # collapsed "frame;frame;frame count" format (flamegraph.pl, speedscope) when the request turns out slow
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS, output_dir: str = PROFILE_DIR):
+        self.interval = interval
+        self.output_dir = output_dir
+        self._threads = {}  # thread id -> request id
+        self._samples = {}  # request id -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def _ensure_sampler(self):
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._sampler.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                threads = dict(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for thread_id, request_id in threads.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                with self._lock:
+                    samples = self._samples.get(request_id)
+                    if samples is not None:
+                        samples[";".join(reversed(stack))] += 1
+
+    def start_request(self, request_id: str):
+        with self._lock:
+            self._samples[request_id] = StackCounter()
+        self._ensure_sampler()
+
+    def attach_thread(self, request_id: str):
+        # Returns the previous owner so nested spans restore it
+        thread_id = threading.get_ident()
+        with self._lock:
+            previous = self._threads.get(thread_id)
+            self._threads[thread_id] = request_id
+        return previous
+
+    def detach_thread(self, previous):
+        thread_id = threading.get_ident()
+        with self._lock:
+            if previous is None:
+                self._threads.pop(thread_id, None)
+            else:
+                self._threads[thread_id] = previous
+
+    def finish_request(self, request_id: str, slow: bool):
+        with self._lock:
+            samples = self._samples.pop(request_id, None)
+        if not slow or not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{request_id}.folded")
+        with open(path, "w") as out:
+            for stack, count in samples.most_common():
+                out.write(f"{stack} {count}\n")
+        return path
+
+
+profiler = SlowRequestProfiler() if PROFILE_SLOW_REQUESTS else None
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+# ==================== SPANS ====================
+_stage_children = {}  # stage -> (latency child, error child); skips the labels() lookup on every span
+
+
+def _stage_metrics(stage: str):
+    children = _stage_children.get(stage)
+    if children is None:
+        children = _stage_children[stage] = (STAGE_LATENCY.labels(stage), STAGE_ERRORS.labels(stage))
+    return children
+
+
+class span:
+    # Times one pipeline stage: `with span("pdf_extract"): ...`. Works in threads and around awaits
+    # in async code. A plain class rather than @contextmanager keeps the per-span cost to ~1-2 us.
+    __slots__ = ("stage", "started", "owner", "previous")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.owner = False
+        if not METRICS_ENABLED:
+            return self
+        # The event loop thread runs many requests at once, so only worker threads are sampled
+        if profiler is not None and request_id_var.get() != "-" and not _on_event_loop():
+            self.owner = True
+            self.previous = profiler.attach_thread(request_id_var.get())
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not METRICS_ENABLED:
+            return False
+        elapsed = time.perf_counter() - self.started
+        latency, errors = _stage_metrics(self.stage)
+        latency.observe(elapsed)
+        if exc_type is not None:
+            errors.inc()
+        totals = _stage_totals.get()
+        if totals is not None:
+            totals[self.stage] = totals.get(self.stage, 0.0) + elapsed
+        if self.owner:
+            profiler.detach_thread(self.previous)
+        return False
+
+
+# ==================== REQUEST MIDDLEWARE ====================
+class RequestMetricsMiddleware:
+    # Plain ASGI middleware: assigns the request id, records request latency per route template
+    # and logs the stage breakdown of slow requests
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        # Client-supplied ids are reused when safe; they also name profile files
+        request_id = _UNSAFE_ID_CHARS.sub("", headers.get(b"x-request-id", b"").decode("latin-1"))[:64] or uuid.uuid4().hex
+        request_token = request_id_var.set(request_id)
+        totals_token = _stage_totals.set({})
+        if profiler is not None:
+            profiler.start_request(request_id)
+
+        status = 500
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            # Route templates, not raw paths, keep the label cardinality bounded
+            REQUEST_LATENCY.labels(scope["method"], getattr(route, "path", "unmatched"), str(status)).observe(elapsed)
+
+            slow = elapsed >= SLOW_REQUEST_SECONDS
+            profile_path = profiler.finish_request(request_id, slow) if profiler is not None else None
+            if slow:
+                stages = ", ".join(f"{stage}={seconds:.3f}s" for stage, seconds in _stage_totals.get().items())
+                logger.warning(
+                    "Slow request %s %s took %.3fs (%s)%s", scope["method"], scope["path"], elapsed,
+                    stages or "no spans", f", profile written to {profile_path}" if profile_path else ""
+                )
+            _stage_totals.reset(totals_token)
+            request_id_var.reset(request_token)
+
+
+def metrics_payload():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,10 +1,19 @@
-from sqlalchemy import Column, Integer, String, Boolean,ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean,ForeignKey, Text, DateTime, Date, Float, Index, LargeBinary
 from database import Base
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import relationship
 
 
 class ResumeData(Base):
     __tablename__ = "resume_data"
+    __table_args__ = (
+        # (score, id) composites back the keyset-paginated ranking queries in /resumes
+        Index("ix_resume_data_overall_score_id", "overall_score", "id"),
+        Index("ix_resume_data_skills_fit_id", "skills_fit", "id"),
+        Index("ix_resume_data_experience_match_id", "experience_match", "id"),
+        Index("ix_resume_data_relevance_id", "relevance", "id"),
+        Index("ix_resume_data_candidate_gmail", "candidate_gmail"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(255), nullable=False)  
@@ -13,6 +22,7 @@ class ResumeData(Base):
     skills_fit = Column(Integer)
     experience_match = Column(Integer)
     cultural_fit = Column(Integer)
+    # Comma-joined previews kept for existing readers; the full lists live in resume_items
     strengths = Column(String(1000)) 
     weaknesses = Column(String(1000))
     missing_elements = Column(String(1000))
@@ -20,19 +30,146 @@ class ResumeData(Base):
     candidate_name = Column(String(100))  
     candidate_gmail = Column(String(100))
     candidate_phone = Column(String(20))
+    scoring_source = Column(String(20), default="llm")  # "llm" or "local" when pre-scoring skipped Gemini
+    created_at = Column(DateTime)  # Ingest time; drives the per-day analytics rollup
 
 
+class ResumeFile(Base):
+    __tablename__ = "resume_files"
 
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(255), unique=True, nullable=False)  # Client-supplied name, used by /resumes/{filename}
+    content_hash = Column(String(64), nullable=False, index=True)  # Blob in content-addressed storage
+    size = Column(Integer, nullable=False)
+    uploaded_at = Column(DateTime, nullable=False)
+
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+    __table_args__ = (
+        Index("ix_analysis_cache_hash_version", "content_hash", "prompt_version", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the uploaded PDF bytes
+    prompt_version = Column(String(20), nullable=False)
+    result = Column(Text, nullable=False)  # Parsed Gemini analysis as JSON
+    created_at = Column(DateTime, nullable=False)
+    last_accessed_at = Column(DateTime, nullable=False, index=True)
+
+
+class Skill(Base):
+    # Canonical skill dictionary: one row per normalized term (see skills.skill_term)
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Binary collation on MySQL: names are compared exactly as canonical_skill produced them, not
+    # case/accent-folded, so "café" and "cafe" are distinct rows and a lookup returns its own spelling
+    name = Column(
+        String(255).with_variant(mysql.VARCHAR(255, charset="utf8mb4", collation="utf8mb4_bin"), "mysql"),
+        unique=True, nullable=False
+    )
+
+
+class ResumeItem(Base):
+    # One row per entry of the strengths / weaknesses / missing_elements / recommendations lists
+    __tablename__ = "resume_items"
+    __table_args__ = (
+        # Covers the skill histogram: GROUP BY skill_id within a kind, counting distinct resumes
+        Index("ix_resume_items_kind_skill_resume", "kind", "skill_id", "resume_id"),
+        Index("ix_resume_items_resume_id", "resume_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resume_data.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(20), nullable=False)
+    position = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)  # As returned by the analysis, never truncated
+    skill_id = Column(Integer, ForeignKey("skills.id"))  # NULL for sentence-like items (see skills.skill_term)
+
+
+class ResumeFingerprint(Base):
+    # Dedup identity of a resume: normalized contact details and MinHash signature (see dedup.py)
+    __tablename__ = "resume_fingerprints"
+    __table_args__ = (
+        # (identifier, resume_id) so the newest resume with a given email or phone is one index seek
+        Index("ix_resume_fingerprints_email_resume", "email", "resume_id"),
+        Index("ix_resume_fingerprints_phone_resume", "phone", "resume_id"),
+        Index("ix_resume_fingerprints_candidate_id", "candidate_id"),
+        Index("ix_resume_fingerprints_content_hash", "content_hash"),
+    )
+
+    resume_id = Column(Integer, ForeignKey("resume_data.id", ondelete="CASCADE"), primary_key=True)
+    candidate_id = Column(Integer, nullable=False)  # resume_id of the candidate's first resume
+    duplicate_of = Column(Integer)  # The earlier resume this one matched, if any
+    match_reason = Column(String(20))  # "content", "email", "phone" or "minhash"
+    similarity = Column(Float)  # Estimated Jaccard similarity to duplicate_of
+    content_hash = Column(String(64))
+    email = Column(String(100))
+    phone = Column(String(20))
+    signature = Column(LargeBinary)  # DEDUP_NUM_PERM little-endian uint32 minima
 
 
+class ResumeLshBucket(Base):
+    # One row per LSH band of a signature; resumes sharing any bucket are near-duplicate candidates
+    __tablename__ = "resume_lsh_buckets"
+
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False)
+    resume_id = Column(Integer, ForeignKey("resume_data.id", ondelete="CASCADE"), primary_key=True)
+
+
+class AnalyticsPending(Base):
+    # Resumes committed since the last rollup compaction; written in the ingest transaction
+    __tablename__ = "analytics_pending"
+
+    resume_id = Column(Integer, ForeignKey("resume_data.id", ondelete="CASCADE"), primary_key=True)
+
+
+class AnalyticsScoreBucket(Base):
+    # Histogram of a score metric in buckets of 10 points (bucket 10 holds exactly 100)
+    __tablename__ = "analytics_score_buckets"
+
+    metric = Column(String(30), primary_key=True)
+    scoring_source = Column(String(20), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    resumes = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+
+
+class AnalyticsDaily(Base):
+    __tablename__ = "analytics_daily"
+
+    day = Column(Date, primary_key=True)
+    resumes = Column(Integer, nullable=False, default=0)
+    shortlisted = Column(Integer, nullable=False, default=0)
+    llm_scored = Column(Integer, nullable=False, default=0)
+    local_scored = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsSkillCount(Base):
+    __tablename__ = "analytics_skill_counts"
+    __table_args__ = (
+        # Top-N skills per kind are read straight off this index
+        Index("ix_analytics_skill_counts_kind_candidates", "kind", "candidates"),
+    )
+
+    kind = Column(String(20), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+    candidates = Column(Integer, nullable=False, default=0)
 
 
 class InterviewReport(Base):
     __tablename__ = "interview_reports"
+    __table_args__ = (
+        # Backs the "latest ready report for a user" lookup in /reports/download
+        Index("ix_interview_reports_user_status_id", "user_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    file_path = Column(String(100), nullable=False)
+    file_path = Column(String(255), nullable=False)  # Content-addressed output, see report_rendering
+    status = Column(String(20), nullable=False, default="ready")  # pending -> ready | failed
+    created_at = Column(DateTime)
 
     # Relationship for better data querying
     user = relationship("User", back_populates="reports")
@@ -49,4 +186,13 @@ class User(Base):
     remaining_attempts = Column(Integer, default=2)
 
     # Relationship with InterviewReport
-    reports = relationship("InterviewReport", back_populates="user")
\ No newline at end of file
+    reports = relationship("InterviewReport", back_populates="user")
+
+class AnalysisJobResult(Base):
+    # Written in the same transaction as a background job's resume, so a job resumed after a crash
+    # finds its committed result instead of inserting the resume again (see analysis_jobs._run_job)
+    __tablename__ = "analysis_job_results"
+
+    job_id = Column(String(32), primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resume_data.id", ondelete="CASCADE"), nullable=False)
+    result = Column(Text, nullable=False)  # Parsed analysis as JSON
@@ -0,0 +1,35 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from metrics import span
+
+# ==================== PASSWORD HASHING CONFIGURATION ====================
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Hashes with a different cost are flagged as needing an update, so they get rehashed at next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small dedicated thread pool runs hashes in parallel without
+# touching the shared threadpool other endpoints depend on. Its size bounds CPU spent on hashing.
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+async def hash_password(password: str) -> str:
+    with span("password_hash"):
+        return await asyncio.get_running_loop().run_in_executor(_executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str):
+    # Returns (is_valid, new_hash); new_hash is set when the stored hash uses an outdated cost
+    with span("password_verify"):
+        return await asyncio.get_running_loop().run_in_executor(
+            _executor, pwd_context.verify_and_update, password, hashed_password
+        )
+
+
+def shutdown_hashing_pool():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,239 @@
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+# ==================== EXTRACTION ENGINE CONFIGURATION ====================
+PDF_EXTRACT_BACKEND = os.getenv("PDF_EXTRACT_BACKEND", "pdfium")  # fast backend, pdfplumber is the fallback
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", os.cpu_count() or 2))  # 0 extracts in-process
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PDF_PAGE_TIMEOUT_SECONDS", 10))
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", 8))
+PDF_MIN_PAGE_CHARS = int(os.getenv("PDF_MIN_PAGE_CHARS", 20))
+
+
+class PageTimeoutError(Exception):
+    pass
+
+
+# ==================== BACKENDS ====================
+# A backend opens the document once and returns a callable page_index -> text plus a close callable
+def _open_pdfium(path):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+
+    def read_page(index: int) -> str:
+        page = pdf[index]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+    return read_page, pdf.close
+
+
+def _open_pdfplumber(path):
+    import pdfplumber
+
+    pdf = pdfplumber.open(path)
+
+    def read_page(index: int) -> str:
+        return pdf.pages[index].extract_text() or ""
+
+    return read_page, pdf.close
+
+
+BACKENDS = {
+    "pdfium": _open_pdfium,
+    "pdfplumber": _open_pdfplumber,
+}
+
+
+def register_backend(name: str, opener):
+    BACKENDS[name] = opener
+
+
+def _is_low_quality(text: str) -> bool:
+    stripped = text.strip()
+    if len(stripped) < PDF_MIN_PAGE_CHARS:
+        return True
+    garbled = sum(1 for ch in stripped if ch == "�" or (not ch.isprintable() and not ch.isspace()))
+    return garbled / len(stripped) > 0.1
+
+
+def _on_page_timeout(signum, frame):
+    raise PageTimeoutError()
+
+
+def _read_with_timeout(read_page, index: int, timeout: float) -> str:
+    # SIGALRM interrupts a runaway page inside the worker so it gives the core back
+    if threading.current_thread() is not threading.main_thread():
+        return read_page(index)
+
+    previous = signal.signal(signal.SIGALRM, _on_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return read_page(index)
+    except PageTimeoutError:
+        return ""
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# ==================== WORKER TASKS ====================
+def _count_pages(path: str) -> int:
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except ImportError:
+        import pdfplumber
+
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+
+def _extract_page_range(path: str, start: int, end: int, backend: str, page_timeout: float) -> list:
+    read_page, close = BACKENDS[backend](path)
+    fallback = None
+    pages = []
+    try:
+        for index in range(start, end):
+            text = _read_with_timeout(read_page, index, page_timeout)
+
+            # pdfplumber's layout analysis is slow, so it only runs on pages the fast backend could not read
+            if backend != "pdfplumber" and _is_low_quality(text):
+                if fallback is None:
+                    fallback = BACKENDS["pdfplumber"](path)
+                fallback_text = _read_with_timeout(fallback[0], index, page_timeout)
+                if len(fallback_text.strip()) > len(text.strip()):
+                    text = fallback_text
+
+            pages.append(text)
+    finally:
+        close()
+        if fallback is not None:
+            fallback[1]()
+    return pages
+
+
+# ==================== PROCESS POOL ====================
+# Each worker is a single-process executor checked out by one task at a time. A task that outlives
+# its deadline cannot be cancelled (SIGALRM does not interrupt pypdfium2's C calls), so its worker
+# is killed and replaced on its own; the other in-flight extractions keep their workers.
+_idle_workers = queue.LifoQueue()
+_worker_slots = threading.BoundedSemaphore(max(PDF_EXTRACT_WORKERS, 1))
+
+
+def _checkout_worker(blocking: bool = True):
+    if not _worker_slots.acquire(blocking=blocking):
+        return None
+    try:
+        return _idle_workers.get_nowait()
+    except queue.Empty:
+        return ProcessPoolExecutor(max_workers=1)
+
+
+def _checkin_worker(worker):
+    _idle_workers.put(worker)
+    _worker_slots.release()
+
+
+def _discard_worker(worker):
+    for process in list(getattr(worker, "_processes", {}).values()):
+        process.terminate()
+    worker.shutdown(wait=False, cancel_futures=True)
+    _worker_slots.release()
+
+
+def _result_or_discard(worker, future, timeout: float):
+    try:
+        result = future.result(timeout=timeout)
+    except (FutureTimeoutError, BrokenProcessPool):
+        _discard_worker(worker)
+        raise
+    except BaseException:
+        _checkin_worker(worker)
+        raise
+    _checkin_worker(worker)
+    return result
+
+
+def shutdown_pool():
+    while True:
+        try:
+            worker = _idle_workers.get_nowait()
+        except queue.Empty:
+            return
+        worker.shutdown(wait=False, cancel_futures=True)
+
+
+def _page_ranges(page_count: int, workers: int):
+    if page_count < PDF_PARALLEL_PAGE_THRESHOLD or workers <= 1:
+        return [(0, page_count)]
+    chunk = -(-page_count // workers)
+    return [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+
+
+def extract_pages(path, backend: str = None) -> list:
+    path = str(path)
+    backend = backend or PDF_EXTRACT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF extraction backend: {backend}")
+
+    if PDF_EXTRACT_WORKERS <= 0:
+        page_count = min(_count_pages(path), PDF_MAX_PAGES)
+        return _extract_page_range(path, 0, page_count, backend, PDF_PAGE_TIMEOUT_SECONDS)
+
+    worker = _checkout_worker()
+    try:
+        page_count = min(
+            _result_or_discard(worker, worker.submit(_count_pages, path), PDF_PAGE_TIMEOUT_SECONDS), PDF_MAX_PAGES
+        )
+    except FutureTimeoutError:
+        raise PageTimeoutError("PDF extraction timed out")
+
+    # Only the first worker is waited for; extra workers are taken when idle, so concurrent
+    # extractions cannot deadlock each holding part of the pool
+    workers = [_checkout_worker()]
+    if page_count >= PDF_PARALLEL_PAGE_THRESHOLD:
+        while len(workers) < PDF_EXTRACT_WORKERS:
+            extra = _checkout_worker(blocking=False)
+            if extra is None:
+                break
+            workers.append(extra)
+
+    ranges = _page_ranges(page_count, len(workers))
+    for extra in workers[len(ranges):]:
+        _checkin_worker(extra)
+    tasks = [
+        (end - start, worker, worker.submit(_extract_page_range, path, start, end, backend, PDF_PAGE_TIMEOUT_SECONDS))
+        for worker, (start, end) in zip(workers, ranges)
+    ]
+
+    # Every worker is collected (returned or replaced) even when an earlier range failed
+    pages = []
+    error = None
+    for page_total, worker, future in tasks:
+        try:
+            # Each worker enforces the per-page limit itself; this is a backstop for a wedged process
+            result = _result_or_discard(worker, future, PDF_PAGE_TIMEOUT_SECONDS * (page_total + 1))
+        except FutureTimeoutError:
+            error = error or PageTimeoutError("PDF extraction timed out")
+        except Exception as e:
+            error = error or e
+        else:
+            pages.extend(result)
+    if error is not None:
+        raise error
+    return pages
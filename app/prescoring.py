@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# ==================== PRE-SCORING CONFIGURATION ====================
+PRESCORE_ENABLED = os.getenv("PRESCORE_ENABLED", "false").lower() == "true"
+PRESCORE_THRESHOLD = float(os.getenv("PRESCORE_THRESHOLD", 25))  # relevance below this skips the LLM
+JOB_PROFILE_PATH = os.getenv("JOB_PROFILE_PATH")
+
+# Used when JOB_PROFILE_PATH is not set; a profile file has the same shape
+DEFAULT_JOB_PROFILE = {
+    "required_skills": ["python", "sql", "rest api", "git"],
+    "preferred_skills": ["fastapi", "django", "docker", "kubernetes", "aws", "postgresql", "mysql", "linux"],
+    "keywords": ["backend", "software engineer", "developer", "microservices", "testing", "ci/cd"],
+    "weights": {"required_skills": 3.0, "preferred_skills": 1.5, "keywords": 0.5},
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+PHONE_RE = re.compile(r"\+?\d[\d\s()-]{7,}\d")
+
+
+def _tokenize(text: str) -> list:
+    return [token.strip("./-") for token in TOKEN_RE.findall(text.lower())]
+
+
+class JobProfileScorer:
+    def __init__(self, profile: dict):
+        weights = profile.get("weights", {})
+        self.terms = []
+        self.groups = []
+        term_weights = []
+        for group in ("required_skills", "preferred_skills", "keywords"):
+            for term in profile.get(group, []):
+                term = " ".join(_tokenize(term))
+                if term and term not in self.terms:
+                    self.terms.append(term)
+                    self.groups.append(group)
+                    term_weights.append(float(weights.get(group, 1.0)))
+
+        # The profile weights play the role of IDF: rarer, more important terms weigh more
+        self.term_ids = {term: index for index, term in enumerate(self.terms)}
+        self.idf = np.asarray(term_weights, dtype=np.float64)
+        self.required_mask = np.asarray([group == "required_skills" for group in self.groups])
+        self.skill_mask = np.asarray([group != "keywords" for group in self.groups])
+        self.profile_vector = self.idf / np.linalg.norm(self.idf) if len(self.idf) else self.idf
+        self.max_ngram = max((len(term.split()) for term in self.terms), default=1)
+
+    def term_counts(self, text: str) -> np.ndarray:
+        tokens = _tokenize(text)
+        ids = []
+        for n in range(1, self.max_ngram + 1):
+            for start in range(len(tokens) - n + 1):
+                term_id = self.term_ids.get(" ".join(tokens[start:start + n]))
+                if term_id is not None:
+                    ids.append(term_id)
+        return np.bincount(np.asarray(ids, dtype=np.int64), minlength=len(self.terms)).astype(np.float64)
+
+    def score_matrix(self, counts: np.ndarray):
+        # counts: (n_resumes, n_terms) -> relevance and skills_fit in 0..100 for every row at once
+        tfidf = np.log1p(counts) * self.idf
+        norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        relevance = (tfidf / norms) @ self.profile_vector * 100
+
+        present = counts > 0
+        skill_weights = self.idf * self.skill_mask
+        skills_fit = (present * skill_weights).sum(axis=1) / max(skill_weights.sum(), 1e-9) * 100
+        return relevance, skills_fit
+
+    def score_many(self, texts: list) -> list:
+        if not texts or not self.terms:
+            return [{"relevance": 0.0, "skills_fit": 0.0, "matched": [], "missing_required": []} for _ in texts]
+
+        counts = np.vstack([self.term_counts(text) for text in texts])
+        relevance, skills_fit = self.score_matrix(counts)
+        results = []
+        for row, rel, fit in zip(counts, relevance, skills_fit):
+            present = row > 0
+            results.append({
+                "relevance": round(float(rel), 1),
+                "skills_fit": round(float(fit), 1),
+                "matched": [self.terms[i] for i in np.flatnonzero(present & self.skill_mask)],
+                "missing_required": [self.terms[i] for i in np.flatnonzero(~present & self.required_mask)],
+            })
+        return results
+
+    def score(self, text: str) -> dict:
+        return self.score_many([text])[0]
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def load_job_profile() -> dict:
+    if JOB_PROFILE_PATH:
+        with open(JOB_PROFILE_PATH) as f:
+            return json.load(f)
+    return DEFAULT_JOB_PROFILE
+
+
+def get_scorer() -> JobProfileScorer:
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = JobProfileScorer(load_job_profile())
+        return _scorer
+
+
+def _guess_candidate_info(text: str) -> dict:
+    email = EMAIL_RE.search(text)
+    phone = PHONE_RE.search(text)
+    first_line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    return {
+        "name": first_line[:100],
+        "gmail": email.group(0) if email else "",
+        "phone": re.sub(r"[^\d+]", "", phone.group(0))[:20] if phone else "",
+    }
+
+
+def prescore_resume(text: str):
+    # Returns a locally scored analysis when the resume is clearly below the threshold, otherwise None
+    if not PRESCORE_ENABLED:
+        return None
+
+    result = get_scorer().score(text)
+    if result["relevance"] >= PRESCORE_THRESHOLD:
+        return None
+
+    return {
+        "overall_score": result["relevance"],
+        "relevance": result["relevance"],
+        "skills_fit": result["skills_fit"],
+        "experience_match": None,
+        "cultural_fit": None,
+        "strengths": result["matched"],
+        "weaknesses": [],
+        "missing_elements": result["missing_required"],
+        "recommendations": [],
+        "candidate_info": _guess_candidate_info(text),
+        "scoring_source": "local",
+    }
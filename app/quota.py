@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db, AsyncSessionLocal
+from models import User
+
+# ==================== QUOTA CONFIGURATION ====================
+QUOTA_MODE = os.getenv("QUOTA_MODE", "database")  # "database" or "local"
+QUOTA_FLUSH_INTERVAL_SECONDS = float(os.getenv("QUOTA_FLUSH_INTERVAL_SECONDS", 2))
+ANALYZE_QUOTA_ENABLED = os.getenv("ANALYZE_QUOTA_ENABLED", "false").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+
+async def _quota_failure(db: AsyncSession, user_id: int):
+    # Only reached when the conditional UPDATE matched nothing: work out why
+    is_subscribed = await db.scalar(select(User.is_subscribed).where(User.id == user_id))
+    if is_subscribed is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if is_subscribed:
+        return False
+    raise HTTPException(status_code=403, detail="Free limit reached. Please subscribe.")
+
+
+# ==================== DATABASE MODE ====================
+async def _charge_in_database(db: AsyncSession, user_id: int, count: int = 1) -> bool:
+    # Check and decrement in one statement, so concurrent requests can never spend the same attempt
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.is_subscribed.isnot(True), User.remaining_attempts >= count)
+        .values(remaining_attempts=User.remaining_attempts - count)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        return True
+    return await _quota_failure(db, user_id)
+
+
+# ==================== LOCAL MODE ====================
+class LocalQuotaCounter:
+    # In-process counters loaded once per user and spent in memory; the spend is written back in
+    # batches. Safe against over-spend within one process, so use it with a single worker process.
+    def __init__(self):
+        self._remaining = {}  # user_id -> remaining attempts, None when subscribed
+        self._unflushed = {}  # user_id -> attempts spent (negative for refunds) since the last flush
+        self._lock = asyncio.Lock()
+
+    async def charge(self, db: AsyncSession, user_id: int, count: int = 1) -> bool:
+        async with self._lock:
+            if user_id not in self._remaining:
+                row = (await db.execute(
+                    select(User.is_subscribed, User.remaining_attempts).where(User.id == user_id)
+                )).first()
+                if row is None:
+                    raise HTTPException(status_code=404, detail="User not found")
+                self._remaining[user_id] = None if row.is_subscribed else (row.remaining_attempts or 0)
+
+            remaining = self._remaining[user_id]
+            if remaining is None:
+                return False
+            if remaining < count:
+                raise HTTPException(status_code=403, detail="Free limit reached. Please subscribe.")
+            self._remaining[user_id] = remaining - count
+            self._unflushed[user_id] = self._unflushed.get(user_id, 0) + count
+            return True
+
+    async def refund(self, user_id: int, count: int = 1):
+        async with self._lock:
+            if self._remaining.get(user_id) is not None:
+                self._remaining[user_id] += count
+                self._unflushed[user_id] = self._unflushed.get(user_id, 0) - count
+
+    async def forget(self, user_id: int):
+        # Called when the user row changes elsewhere (e.g. subscription). The user's unflushed spend is
+        # written first and under the lock, so the reload on the next charge already includes it.
+        async with self._lock:
+            amount = self._unflushed.pop(user_id, 0)
+            if amount:
+                try:
+                    await self._write_spend({user_id: amount})
+                except Exception:
+                    logger.exception("Failed to flush quota for user %s; keeping its cached counter", user_id)
+                    self._unflushed[user_id] = self._unflushed.get(user_id, 0) + amount
+                    return
+            self._remaining.pop(user_id, None)
+
+    @staticmethod
+    async def _write_spend(spent: dict):
+        async with AsyncSessionLocal() as db:
+            for user_id, amount in spent.items():
+                await db.execute(
+                    update(User).where(User.id == user_id)
+                    .values(remaining_attempts=User.remaining_attempts - amount)
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+
+    async def flush(self):
+        async with self._lock:
+            spent, self._unflushed = self._unflushed, {}
+        spent = {user_id: amount for user_id, amount in spent.items() if amount}
+        if not spent:
+            return
+
+        try:
+            await self._write_spend(spent)
+        except Exception:
+            logger.exception("Failed to flush quota counters; retrying on the next flush")
+            async with self._lock:
+                for user_id, amount in spent.items():
+                    self._unflushed[user_id] = self._unflushed.get(user_id, 0) + amount
+
+    async def run_flusher(self):
+        while True:
+            await asyncio.sleep(QUOTA_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+
+local_counter = LocalQuotaCounter()
+
+
+# ==================== PUBLIC API ====================
+async def charge_attempt(db: AsyncSession, user_id: int, count: int = 1) -> bool:
+    # True when free attempts were spent, False for subscribed (unlimited) users. All-or-nothing
+    # for count > 1. Raises 404 for unknown users and 403 once the free attempts are used up.
+    if QUOTA_MODE == "local":
+        return await local_counter.charge(db, user_id, count)
+    return await _charge_in_database(db, user_id, count)
+
+
+async def refund_attempt(db: AsyncSession, user_id: int, count: int = 1):
+    if QUOTA_MODE == "local":
+        await local_counter.refund(user_id, count)
+        return
+    await db.execute(
+        update(User).where(User.id == user_id, User.is_subscribed.isnot(True))
+        .values(remaining_attempts=User.remaining_attempts + count)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def forget_user_quota(user_id: int):
+    if QUOTA_MODE == "local":
+        await local_counter.forget(user_id)
+
+
+async def _analysis_user(request: Request, db: AsyncSession):
+    from routes.user_routes import oauth2_scheme, get_current_user
+
+    return await get_current_user(await oauth2_scheme(request), db)
+
+
+async def charge_analysis_attempt(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Dependency for the single-file /analyze_resume/ endpoints: when ANALYZE_QUOTA_ENABLED, the caller
+    # must be logged in and each analysis spends one attempt. Returns (user, charged) or None when off.
+    if not ANALYZE_QUOTA_ENABLED:
+        return None
+
+    user = await _analysis_user(request, db)
+    charged = await charge_attempt(db, user.id)
+    await db.commit()
+    return user, charged
+
+
+async def analysis_quota_user(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Dependency for the batch endpoint: authenticates up front; the attempts are charged with
+    # charge_analysis_attempts once the upload is unpacked and the number of files is known
+    if not ANALYZE_QUOTA_ENABLED:
+        return None
+    return await _analysis_user(request, db)
+
+
+async def charge_analysis_attempts(user, count: int):
+    # One attempt per file; returns the same (user, charged) shape as charge_analysis_attempt
+    if user is None:
+        return None
+    async with AsyncSessionLocal() as db:
+        charged = await charge_attempt(db, user.id, count)
+        await db.commit()
+    return user, charged
+
+
+async def refund_analysis_attempt(quota, count: int = 1):
+    # A failed analysis does not use up the caller's free attempts
+    if quota is None or not quota[1] or count <= 0:
+        return
+    await refund_user_attempts(quota[0].id, count)
+
+
+async def refund_user_attempts(user_id: int, count: int = 1):
+    # For callers that only kept the charged user's id, such as analysis jobs resumed after a restart
+    async with AsyncSessionLocal() as db:
+        await refund_attempt(db, user_id, count)
+        await db.commit()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ==================== REPORT RENDERING CONFIGURATION ====================
+REPORT_DIR = os.path.join(os.getcwd(), "uploaded_reports")
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", 2))
+REPORT_TEMPLATE_VERSION = "1"  # Bump when the layout changes so old content-addressed outputs are not reused
+REPORT_PRECOMPRESS = os.getenv("REPORT_PRECOMPRESS", "true").lower() == "true"
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+# ==================== TEMPLATE ====================
+# Built once per worker process: importing fpdf, loading the core font metrics and measuring
+# the fixed header all happen in the pool initializer instead of on every report.
+_template = None
+
+
+def _build_template():
+    from fpdf import FPDF
+
+    class PDFReport(FPDF):
+        def header(self):
+            self.set_font('Arial', 'B', 16)
+            self.cell(0, 10, 'Interview Report', ln=True, align='C')
+            self.ln(10)
+
+        def chapter_title(self, title):
+            self.set_font('Arial', 'B', 14)
+            self.cell(0, 10, title, ln=True)
+            self.ln(5)
+
+        def chapter_body(self, body):
+            self.set_font('Arial', '', 12)
+            self.multi_cell(0, 10, body)
+            self.ln()
+
+    # Render a throwaway document so every font/style used by the layout is loaded and cached
+    warm = PDFReport()
+    warm.add_page()
+    warm.chapter_title("warm-up")
+    warm.chapter_body("warm-up")
+    return PDFReport
+
+
+def _init_worker():
+    global _template
+    _template = _build_template()
+
+
+def render_report(output_path: str, username: str, score: int, strengths: list, weaknesses: list) -> str:
+    global _template
+    if _template is None:
+        _template = _build_template()
+
+    pdf = _template()
+    pdf.add_page()
+    pdf.chapter_title(f"Interview Report for {username}")
+    pdf.chapter_body(f"Score: {score}")
+    pdf.chapter_body(f"Strengths: {', '.join(strengths)}")
+    pdf.chapter_body(f"Weaknesses: {', '.join(weaknesses)}")
+
+    # Write to a temp file and rename, so a reader never sees a half-written report
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix=".part")
+    os.close(fd)
+    try:
+        pdf.output(tmp_path)
+        if REPORT_PRECOMPRESS:
+            # Written before the PDF appears, so the report is never served without its variant
+            from file_delivery import write_precompressed
+            write_precompressed(tmp_path, f"{output_path}.gz")
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def report_output_path(username: str, score: int, strengths: list, weaknesses: list) -> str:
+    # Content-addressed by the render inputs: concurrent requests never share a file unless
+    # they would produce the same report, in which case the existing file is reused
+    payload = json.dumps([REPORT_TEMPLATE_VERSION, username, score, strengths, weaknesses], sort_keys=True)
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    return os.path.join(REPORT_DIR, digest[:2], f"{digest}.pdf")
+
+
+# ==================== RENDER POOL ====================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_RENDER_WORKERS, initializer=_init_worker)
+        return _pool
+
+
+async def render_in_pool(output_path: str, username: str, score: int, strengths: list, weaknesses: list) -> str:
+    if os.path.exists(output_path):
+        return output_path
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_pool(), render_report, output_path, username, score, strengths, weaknesses
+    )
+
+
+def shutdown_render_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,118 @@
+import os
+from datetime import datetime, timedelta
+from typing import Literal
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import AnalyticsDaily, AnalyticsScoreBucket, AnalyticsSkillCount, Skill
+
+router = APIRouter()
+
+# Every endpoint reads a bounded number of rollup rows, so responses are cheap to compute;
+# the cache only absorbs dashboard refresh storms
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", 30))
+_response_cache = TTLCache(maxsize=256, ttl=ANALYTICS_CACHE_TTL_SECONDS)
+
+ListKind = Literal["strengths", "weaknesses", "missing_elements", "recommendations"]
+
+
+async def _cached(response: Response, key: tuple, compute):
+    response.headers["Cache-Control"] = f"private, max-age={ANALYTICS_CACHE_TTL_SECONDS}"
+    result = _response_cache.get(key)
+    if result is None:
+        result = _response_cache[key] = await compute()
+    return result
+
+
+@router.get("/scores")
+async def score_distribution(
+    response: Response,
+    metric: Literal["overall_score", "skills_fit"] = "overall_score",
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def compute():
+        rows = (await db.execute(
+            select(AnalyticsScoreBucket).where(AnalyticsScoreBucket.metric == metric)
+        )).scalars().all()
+
+        histogram = [0] * 11
+        sources = {}
+        for row in rows:
+            histogram[row.bucket] += row.resumes
+            totals = sources.setdefault(row.scoring_source, [0, 0.0])
+            totals[0] += row.resumes
+            totals[1] += row.score_sum
+
+        resumes = sum(histogram)
+        return {
+            "metric": metric,
+            "resumes": resumes,
+            "average": round(sum(total for _, total in sources.values()) / resumes, 2) if resumes else None,
+            "average_by_scoring_source": {
+                source: round(total / count, 2) for source, (count, total) in sources.items() if count
+            },
+            "histogram": [
+                {"range": "100" if bucket == 10 else f"{bucket * 10}-{bucket * 10 + 9}", "resumes": count}
+                for bucket, count in enumerate(histogram)
+            ],
+        }
+
+    return await _cached(response, ("scores", metric), compute)
+
+
+@router.get("/daily")
+async def daily_counts(
+    response: Response,
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def compute():
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = (await db.execute(
+            select(AnalyticsDaily).where(AnalyticsDaily.day >= since).order_by(AnalyticsDaily.day)
+        )).scalars().all()
+        return [
+            {
+                "day": row.day.isoformat(), "resumes": row.resumes, "shortlisted": row.shortlisted,
+                "llm_scored": row.llm_scored, "local_scored": row.local_scored,
+            }
+            for row in rows
+        ]
+
+    return await _cached(response, ("daily", days), compute)
+
+
+@router.get("/funnel")
+async def funnel(response: Response, db: AsyncSession = Depends(get_async_db)):
+    async def compute():
+        # One row per day, so this stays small however many resumes there are
+        totals = (await db.execute(select(
+            func.coalesce(func.sum(AnalyticsDaily.resumes), 0),
+            func.coalesce(func.sum(AnalyticsDaily.llm_scored), 0),
+            func.coalesce(func.sum(AnalyticsDaily.shortlisted), 0),
+        ))).one()
+        return {"analyzed": totals[0], "scored_by_llm": totals[1], "shortlisted": totals[2]}
+
+    return await _cached(response, ("funnel",), compute)
+
+
+@router.get("/skills")
+async def top_skills(
+    response: Response,
+    kind: ListKind = "missing_elements",
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def compute():
+        rows = (await db.execute(
+            select(Skill.name, AnalyticsSkillCount.candidates)
+            .join(Skill, Skill.id == AnalyticsSkillCount.skill_id)
+            .where(AnalyticsSkillCount.kind == kind)
+            .order_by(AnalyticsSkillCount.candidates.desc())
+            .limit(limit)
+        )).all()
+        return [{"skill": row.name, "candidates": row.candidates} for row in rows]
+
+    return await _cached(response, ("skills", kind, limit), compute)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from batch_ingest import count_batch_files, collect_batch_files, stream_batch
+from quota import analysis_quota_user, charge_analysis_attempts, refund_analysis_attempt
+
+router = APIRouter()
+
+@router.post("")
+async def analyze_resume_batch(files: list[UploadFile] = File(...), user=Depends(analysis_quota_user)):
+    # Accepts any mix of PDFs and ZIP archives of PDFs; results stream back as NDJSON.
+    # Quota is charged one attempt per PDF before anything is written, so a refused batch leaves no
+    # blobs or filename index rows behind; failed files are refunded.
+    file_count = await run_in_threadpool(count_batch_files, files)
+    quota = await charge_analysis_attempts(user, file_count)
+    try:
+        items = await run_in_threadpool(collect_batch_files, files)
+    except BaseException:
+        await refund_analysis_attempt(quota, file_count)
+        raise
+    return StreamingResponse(
+        stream_batch(items, on_failure=lambda count: refund_analysis_attempt(quota, count)),
+        media_type="application/x-ndjson"
+    )
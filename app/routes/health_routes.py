@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from llm_client import get_llm_client
+from startup import startup_state
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness(db: AsyncSession = Depends(get_async_db)):
+    checks = dict(startup_state)
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception:
+        checks["database"] = False
+    checks["llm_circuit"] = get_llm_client().breaker.state
+
+    ready = checks["database"] and checks["llm"] and checks["numpy"] and checks["llm_circuit"] != "open"
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "checks": checks})
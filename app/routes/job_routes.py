@@ -0,0 +1,62 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from database import get_db
+from analysis_jobs import get_job_queue, get_job
+from analysis_pipeline import save_upload
+from quota import charge_analysis_attempt, refund_analysis_attempt
+
+router = APIRouter()
+
+@router.post("", status_code=202)
+async def submit_analysis_job(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    quota=Depends(charge_analysis_attempt)
+):
+    if not file.filename.endswith(".pdf"):
+        await refund_analysis_attempt(quota)
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    # The job finishes on an executor thread; its refund has to run back on this event loop
+    loop = asyncio.get_running_loop()
+
+    def refund_failed_job():
+        asyncio.run_coroutine_threadsafe(refund_analysis_attempt(quota), loop)
+
+    # Capacity is checked before the upload is written, so a full queue leaves no orphan blob behind
+    queue = get_job_queue()
+    if not queue.reserve():
+        await refund_analysis_attempt(quota)
+        raise HTTPException(status_code=429, detail="Analysis queue is full. Please retry later.")
+
+    try:
+        try:
+            file_path, content_hash = await run_in_threadpool(save_upload, db, file)
+        except BaseException:
+            queue.release()
+            raise
+        # From here on the reserved slot belongs to the job
+        job_id = await run_in_threadpool(
+            queue.submit, file_path, file.filename, content_hash,
+            refund_failed_job if quota is not None else None, reserved=True,
+            charged_user_id=quota[0].id if quota is not None and quota[1] else None
+        )
+    except HTTPException:
+        db.rollback()
+        await refund_analysis_attempt(quota)
+        raise
+    except Exception as e:
+        db.rollback()
+        await refund_analysis_attempt(quota)
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/analyze_resume/jobs/{job_id}"}
+
+@router.get("/{job_id}")
+async def get_analysis_job(job_id: str):
+    job = await run_in_threadpool(get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import ResumeData
+from vector_index import get_vector_index
+
+router = APIRouter()
+
+class MatchRequest(BaseModel):
+    job_description: str = Field(..., min_length=1)
+    top_k: int = Field(10, ge=1, le=100)
+
+@router.post("")
+async def match_candidates(request: MatchRequest, db: AsyncSession = Depends(get_async_db)):
+    hits = await run_in_threadpool(get_vector_index().search, request.job_description, request.top_k)
+    if not hits:
+        return {"items": []}
+
+    rows = (await db.execute(
+        select(
+            ResumeData.id, ResumeData.filename, ResumeData.candidate_name,
+            ResumeData.candidate_gmail, ResumeData.overall_score, ResumeData.skills_fit
+        ).where(ResumeData.id.in_([hit["resume_id"] for hit in hits]))
+    )).all()
+    resumes = {row.id: dict(row._mapping) for row in rows}
+
+    return {"items": [{**resumes[hit["resume_id"]], **hit} for hit in hits if hit["resume_id"] in resumes]}
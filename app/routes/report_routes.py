@@ -1,77 +1,168 @@
-from fpdf import FPDF
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal
+from file_delivery import file_response
+from metrics import span
 from models import User, InterviewReport
+from quota import charge_attempt, refund_attempt
+from report_rendering import report_output_path, render_in_pool, PENDING, READY, FAILED
+from routes.user_routes import invalidate_cached_user
 import os
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# A render still pending after this long was lost (worker restart or crash) and is failed by the sweeper
+REPORT_PENDING_TIMEOUT_SECONDS = int(os.getenv("REPORT_PENDING_TIMEOUT_SECONDS", 600))
+REPORT_SWEEP_INTERVAL_SECONDS = float(os.getenv("REPORT_SWEEP_INTERVAL_SECONDS", 60))
+
+# Keeps references to in-flight render tasks so they are not garbage collected
+_render_tasks = set()
 
 class ReportData(BaseModel):
     score: int
     strengths: list[str]
     weaknesses: list[str]
 
-class PDFReport(FPDF):
-    def header(self):
-        self.set_font('Arial', 'B', 16)
-        self.cell(0, 10, 'Interview Report', ln=True, align='C')
-        self.ln(10)
-
-    def chapter_title(self, title):
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, title, ln=True)
-        self.ln(5)
-
-    def chapter_body(self, body):
-        self.set_font('Arial', '', 12)
-        self.multi_cell(0, 10, body)
-        self.ln()
-
-@router.post("/generate/{user_id}")
-async def generate_report(user_id: int, report_data: ReportData, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Check subscription or limit attempts
-    if not user.is_subscribed:
-        if user.remaining_attempts is None or user.remaining_attempts <= 0:
-            raise HTTPException(status_code=403, detail="Free limit reached. Please subscribe.")
-        user.remaining_attempts -= 1
-        db.commit()
-
-    # Create PDF Report
-    pdf = PDFReport()
-    pdf.add_page()
-    pdf.chapter_title(f"Interview Report for {user.username}")
-    pdf.chapter_body(f"Score: {report_data.score}")
-    pdf.chapter_body(f"Strengths: {', '.join(report_data.strengths)}")
-    pdf.chapter_body(f"Weaknesses: {', '.join(report_data.weaknesses)}")
-
-    # Save PDF file
-    report_dir = os.path.join(os.getcwd(), "uploaded_reports")
-    os.makedirs(report_dir, exist_ok=True)
-    report_path = os.path.join(report_dir, f"{user.username}_report.pdf")
-
+async def _render_and_record(report_id: int, user_id: int, charged: bool, output_path: str,
+                             username: str, report_data: ReportData):
+    status = READY
     try:
-        pdf.output(report_path)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
+        with span("report_render"):
+            await render_in_pool(output_path, username, report_data.score, report_data.strengths, report_data.weaknesses)
+    except Exception:
+        logger.exception("Rendering report %s failed", report_id)
+        status = FAILED
+
+    async with AsyncSessionLocal() as db:
+        # Guarded on pending: a row the sweeper already resolved (and refunded) is left alone
+        result = await db.execute(
+            update(InterviewReport)
+            .where(InterviewReport.id == report_id, InterviewReport.status == PENDING)
+            .values(status=status)
+        )
+        if status == FAILED and charged and result.rowcount:
+            # The attempt was charged up front; give it back when no report was produced
+            await refund_attempt(db, user_id)
+        await db.commit()
 
-    # Save report in the database
-    report_entry = InterviewReport(user_id=user.id, file_path=report_path)
+@router.post("/generate/{user_id}", status_code=202)
+async def generate_report(user_id: int, report_data: ReportData, db: AsyncSession = Depends(get_async_db)):
+    # Check subscription or limit attempts with a single conditional UPDATE (404/403 raised inside)
+    charged = await charge_attempt(db, user_id)
+    user = await db.scalar(select(User).where(User.id == user_id))
+
+    report_path = report_output_path(user.username, report_data.score, report_data.strengths, report_data.weaknesses)
+    already_rendered = os.path.exists(report_path)
+
+    # Quota decrement and report row are committed together
+    report_entry = InterviewReport(
+        user_id=user.id,
+        file_path=report_path,
+        status=READY if already_rendered else PENDING,
+        created_at=datetime.utcnow()
+    )
     db.add(report_entry)
-    db.commit()
+    await db.commit()
+    invalidate_cached_user(user.username)
 
-    return {"message": "Report generated successfully.", "report_url": report_path}
+    # Rendering happens in the worker pool; the client polls /reports/status/{report_id}
+    if not already_rendered:
+        task = asyncio.create_task(
+            _render_and_record(report_entry.id, user.id, charged, report_path, user.username, report_data)
+        )
+        _render_tasks.add(task)
+        task.add_done_callback(_render_tasks.discard)
 
-@router.get("/download/{user_id}")
-async def download_report(user_id: int, db: Session = Depends(get_db)):
-    report = db.query(InterviewReport).filter(InterviewReport.user_id == user_id).first()
+    return {
+        "message": "Report generation started." if not already_rendered else "Report generated successfully.",
+        "report_id": report_entry.id,
+        "status": report_entry.status,
+        "status_url": f"/reports/status/{report_entry.id}",
+        "report_url": report_path
+    }
+
+@router.get("/status/{report_id}")
+async def report_status(report_id: int, db: AsyncSession = Depends(get_async_db)):
+    report = await db.scalar(select(InterviewReport).where(InterviewReport.id == report_id))
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return FileResponse(report.file_path, headers={"Content-Disposition": "attachment"})
+    response = {"report_id": report.id, "status": report.status}
+    if report.status == READY:
+        response["download_url"] = f"/reports/{report.id}/download"
+        response["report_url"] = report.file_path
+    return response
+
+async def _report_file_response(request: Request, file_path):
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    # Report files are named by the hash of their render inputs and never rewritten
+    response = await file_response(
+        request, file_path, content_hash=Path(file_path).stem,
+        cache_control="private, no-cache", headers={"Content-Disposition": "attachment"}
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Report file not found")
+    return response
+
+@router.get("/{report_id}/download")
+async def download_report_by_id(report_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    file_path = await db.scalar(
+        select(InterviewReport.file_path).where(InterviewReport.id == report_id, InterviewReport.status == READY)
+    )
+    return await _report_file_response(request, file_path)
+
+@router.get("/download/{user_id}")
+async def download_report(user_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # The user's newest ready report. Served from ix_interview_reports_user_status_id: only the
+    # file path of the newest row is read
+    file_path = await db.scalar(
+        select(InterviewReport.file_path)
+        .where(InterviewReport.user_id == user_id, InterviewReport.status == READY)
+        .order_by(InterviewReport.id.desc())
+        .limit(1)
+    )
+    return await _report_file_response(request, file_path)
+
+# ==================== LOST RENDER RECOVERY ====================
+async def sweep_stale_reports() -> int:
+    # Render tasks live in the worker's memory, so a restart or crash leaves their rows pending.
+    # The render inputs are not stored, so such rows cannot be re-run: they become ready when the
+    # file was written after all, otherwise failed with the attempt refunded.
+    cutoff = datetime.utcnow() - timedelta(seconds=REPORT_PENDING_TIMEOUT_SECONDS)
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(InterviewReport.id, InterviewReport.user_id, InterviewReport.file_path)
+            .where(InterviewReport.status == PENDING, InterviewReport.created_at < cutoff)
+        )).all()
+        for row in rows:
+            rendered = await asyncio.to_thread(os.path.exists, row.file_path)
+            # Guarded on pending, so a render finishing concurrently keeps its own result
+            result = await db.execute(
+                update(InterviewReport)
+                .where(InterviewReport.id == row.id, InterviewReport.status == PENDING)
+                .values(status=READY if rendered else FAILED)
+            )
+            if result.rowcount and not rendered:
+                # Whether the attempt was charged is not stored; refund_attempt skips subscribed users
+                await refund_attempt(db, row.user_id)
+        await db.commit()
+    if rows:
+        logger.warning("Resolved %d report renders lost by a previous worker", len(rows))
+    return len(rows)
+
+async def run_report_sweeper():
+    while True:
+        try:
+            await sweep_stale_reports()
+        except Exception:
+            logger.exception("Report sweep failed")
+        await asyncio.sleep(REPORT_SWEEP_INTERVAL_SECONDS)
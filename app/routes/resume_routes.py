@@ -0,0 +1,129 @@
+import base64
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import ResumeData, ResumeFingerprint
+
+router = APIRouter()
+
+SORTABLE_COLUMNS = {
+    "overall_score": ResumeData.overall_score,
+    "skills_fit": ResumeData.skills_fit,
+    "experience_match": ResumeData.experience_match,
+    "relevance": ResumeData.relevance,
+}
+
+# Only these columns are loaded; list endpoints never build full ORM objects
+LIST_COLUMNS = [
+    ResumeData.id, ResumeData.filename, ResumeData.candidate_name, ResumeData.candidate_gmail,
+    ResumeData.overall_score, ResumeData.relevance, ResumeData.skills_fit,
+    ResumeData.experience_match, ResumeData.cultural_fit, ResumeData.scoring_source,
+]
+
+SortField = Literal["overall_score", "skills_fit", "experience_match", "relevance"]
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def search_resumes(db: AsyncSession, sort_by: str, descending: bool, limit: int, cursor: Optional[str] = None,
+                         filters: Optional[dict] = None, candidate_gmail: Optional[str] = None):
+    sort_column = SORTABLE_COLUMNS[sort_by]
+    # Rows without a score cannot be placed in the keyset order, so they are left out
+    query = select(*LIST_COLUMNS).where(sort_column.isnot(None))
+
+    for field, (low, high) in (filters or {}).items():
+        if low is not None:
+            query = query.where(SORTABLE_COLUMNS[field] >= low)
+        if high is not None:
+            query = query.where(SORTABLE_COLUMNS[field] <= high)
+    if candidate_gmail:
+        query = query.where(ResumeData.candidate_gmail == candidate_gmail)
+
+    # Keyset pagination on (sort column, id): the index seeks straight to the cursor instead of OFFSET scanning
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        if descending:
+            query = query.where(or_(sort_column < last_value, and_(sort_column == last_value, ResumeData.id < last_id)))
+        else:
+            query = query.where(or_(sort_column > last_value, and_(sort_column == last_value, ResumeData.id > last_id)))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), ResumeData.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), ResumeData.id.asc())
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last[sort_by], last["id"])
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("")
+async def list_resumes(
+    sort_by: SortField = "overall_score",
+    order: Literal["asc", "desc"] = "desc",
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    min_overall_score: Optional[float] = None,
+    max_overall_score: Optional[float] = None,
+    min_skills_fit: Optional[float] = None,
+    max_skills_fit: Optional[float] = None,
+    min_experience_match: Optional[float] = None,
+    max_experience_match: Optional[float] = None,
+    min_relevance: Optional[float] = None,
+    max_relevance: Optional[float] = None,
+    candidate_gmail: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    filters = {
+        "overall_score": (min_overall_score, max_overall_score),
+        "skills_fit": (min_skills_fit, max_skills_fit),
+        "experience_match": (min_experience_match, max_experience_match),
+        "relevance": (min_relevance, max_relevance),
+    }
+    return await search_resumes(db, sort_by, order == "desc", limit, cursor, filters, candidate_gmail)
+
+
+@router.get("/top")
+async def top_resumes(
+    by: SortField = "overall_score",
+    n: int = Query(10, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db)
+):
+    return (await search_resumes(db, by, True, n))["items"]
+
+
+@router.get("/{resume_id}/versions")
+async def resume_versions(resume_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Every resume linked to the same candidate by the dedup stage, oldest first
+    candidate_id = (await db.execute(
+        select(ResumeFingerprint.candidate_id).where(ResumeFingerprint.resume_id == resume_id)
+    )).scalar()
+    if candidate_id is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    rows = (await db.execute(
+        select(*LIST_COLUMNS, ResumeFingerprint.duplicate_of, ResumeFingerprint.match_reason,
+               ResumeFingerprint.similarity)
+        .join(ResumeFingerprint, ResumeFingerprint.resume_id == ResumeData.id)
+        .where(ResumeFingerprint.candidate_id == candidate_id)
+        .order_by(ResumeData.id)
+    )).all()
+    return {"candidate_id": candidate_id, "versions": [dict(row._mapping) for row in rows]}
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import ResumeData
+from search_index import search, SearchQueryError
+
+router = APIRouter()
+
+@router.get("")
+async def search_resumes(
+    q: str = Query(..., min_length=1, description='FTS5 query, e.g. kubernetes AND go, "machine learning", pyth*'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        hits = await run_in_threadpool(search, q, limit, offset)
+    except SearchQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search query: {str(e)}")
+
+    if not hits:
+        return {"items": []}
+
+    rows = (await db.execute(
+        select(
+            ResumeData.id, ResumeData.filename, ResumeData.candidate_name,
+            ResumeData.candidate_gmail, ResumeData.overall_score
+        ).where(ResumeData.id.in_([hit["resume_id"] for hit in hits]))
+    )).all()
+    resumes = {row.id: dict(row._mapping) for row in rows}
+
+    return {"items": [{**resumes[hit["resume_id"]], **hit} for hit in hits if hit["resume_id"] in resumes]}
@@ -0,0 +1,32 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from models import ResumeItem, Skill
+
+router = APIRouter()
+
+ListKind = Literal["strengths", "weaknesses", "missing_elements", "recommendations"]
+
+
+@router.get("/histogram")
+async def skill_histogram(
+    kind: ListKind = "missing_elements",
+    limit: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Single GROUP BY over ix_resume_items_kind_skill_resume; each resume counts once per skill
+    candidates = func.count(distinct(ResumeItem.resume_id)).label("candidates")
+    top = (
+        select(ResumeItem.skill_id, candidates)
+        .where(ResumeItem.kind == kind, ResumeItem.skill_id.isnot(None))
+        .group_by(ResumeItem.skill_id)
+        .order_by(candidates.desc())
+        .limit(limit)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(Skill.name, top.c.candidates).join(top, Skill.id == top.c.skill_id).order_by(top.c.candidates.desc())
+    )).all()
+    return {"kind": kind, "items": [{"skill": row.name, "candidates": row.candidates} for row in rows]}
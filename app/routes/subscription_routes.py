@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 from models import User
+from routes.user_routes import invalidate_cached_user
+from quota import forget_user_quota
 
 router = APIRouter()
 
 @router.post("/subscribe/{user_id}")
-async def subscribe_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def subscribe_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -16,14 +19,15 @@ async def subscribe_user(user_id: int, db: Session = Depends(get_db)):
 
     user.is_subscribed = True
     user.remaining_attempts = None  # Unlimited attempts for subscribed users
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_cached_user(user.username)
+    await forget_user_quota(user.id)
 
     return {"message": "Subscription activated successfully."}
 
 @router.get("/status/{user_id}")
-async def check_subscription_status(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def check_subscription_status(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
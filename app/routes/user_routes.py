@@ -1,19 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Body
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
-from database import get_db
+from database import get_async_db
 from schemas import UserCreate, UserLogin  # Ensure UserLogin schema exists
-from passlib.context import CryptContext
+from cachetools import TTLCache
+from password_hashing import hash_password, verify_password
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 import os
 
 router = APIRouter()
 
-# Password hashing setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Secret key and algorithm for JWT token
 SECRET_KEY = os.getenv("SECRET_KEY", "default_secret_key")
 ALGORITHM = "HS256"
@@ -22,6 +21,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
 # OAuth2 scheme for token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
+# Short-lived cache of authenticated users keyed on the token subject, so protected
+# requests skip the User lookup. Entries are dropped whenever the user row changes.
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+def invalidate_cached_user(username: str):
+    _user_cache.pop(username, None)
+
 # Utility function to create JWT token
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)):
     to_encode = data.copy()
@@ -32,14 +40,17 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes
 
 # Register route
 @router.post("/register", response_model=dict)
-def register_user(
+async def register_user(
     user_data: UserCreate = Body(...),  # Added Body() for Swagger to recognize fields
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if db.query(User).filter((User.email == user_data.email) | (User.username == user_data.username)).first():
+    existing = await db.scalar(
+        select(User.id).where((User.email == user_data.email) | (User.username == user_data.username)).limit(1)
+    )
+    if existing is not None:
         raise HTTPException(status_code=400, detail="Email or username already exists.")
 
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -48,41 +59,57 @@ def register_user(
         remaining_attempts=2
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
 
     return {"message": "User registered successfully."}
 
 # Login route
 @router.post("/login", response_model=dict)
-def login_user(
+async def login_user(
     user_data: UserLogin = Body(...),  # Replaced OAuth2PasswordRequestForm with UserLogin schema
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).where(
         (User.email == user_data.identifier) | 
         (User.username == user_data.identifier)
-    ).first()
+    ))
 
-    if not user or not pwd_context.verify(user_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials.")
 
+    is_valid, new_hash = await verify_password(user_data.password, user.hashed_password)
+    if not is_valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials.")
+
+    # Transparently upgrade hashes created with a different BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_cached_user(user.username)
+
     access_token = create_access_token({"sub": user.username})
 
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Dependency for protected routes
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid token.")
 
-        user = db.query(User).filter(User.username == username).first()
+        user = _user_cache.get(username)
+        if user is not None:
+            return user
+
+        user = await db.scalar(select(User).where(User.username == username))
         if user is None:
             raise HTTPException(status_code=401, detail="User not found.")
 
+        # The session never expires attributes on commit, so the detached copy stays readable
+        db.expunge(user)
+        _user_cache[username] = user
         return user
 
     except JWTError:
@@ -0,0 +1,113 @@
+import logging
+import os
+import sqlite3
+import zlib
+from contextlib import contextmanager
+
+# ==================== SEARCH INDEX CONFIGURATION ====================
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "resume_search.db")
+
+# bm25() column weights, in the same order as the FTS columns below
+BM25_WEIGHTS = (1.0, 3.0, 1.0, 2.0, 0.5, 1.5)
+
+logger = logging.getLogger(__name__)
+
+
+class SearchQueryError(Exception):
+    pass
+
+
+@contextmanager
+def _connect():
+    conn = sqlite3.connect(SEARCH_INDEX_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def init_search_index():
+    with _connect() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        # rowid is ResumeData.id
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5("
+            " resume_text, strengths, weaknesses, missing_elements, recommendations, candidate_name,"
+            " tokenize = 'porter unicode61')"
+        )
+        # Extracted text by content hash, so cache hits that skip extraction can still be indexed
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS resume_texts (content_hash TEXT PRIMARY KEY, text BLOB NOT NULL)"
+        )
+
+
+def _row_values(resume_id: int, text: str, parsed_data: dict):
+    return (
+        resume_id,
+        text or "",
+        " ".join(parsed_data.get("strengths", [])),
+        " ".join(parsed_data.get("weaknesses", [])),
+        " ".join(parsed_data.get("missing_elements", [])),
+        " ".join(parsed_data.get("recommendations", [])),
+        (parsed_data.get("candidate_info") or {}).get("name") or "",
+    )
+
+
+def index_resumes(entries):
+    # entries: iterable of (resume_id, content_hash, text or None, parsed_data); one transaction for all of them.
+    # Returns the text indexed for each entry, including text recovered by content hash.
+    entries = list(entries)
+    if not entries:
+        return []
+
+    with _connect() as conn:
+        rows = []
+        for resume_id, content_hash, text, parsed_data in entries:
+            if text is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO resume_texts (content_hash, text) VALUES (?, ?)",
+                    (content_hash, zlib.compress(text.encode()))
+                )
+            else:
+                stored = conn.execute(
+                    "SELECT text FROM resume_texts WHERE content_hash = ?", (content_hash,)
+                ).fetchone()
+                text = zlib.decompress(stored["text"]).decode() if stored else ""
+            rows.append(_row_values(resume_id, text, parsed_data))
+
+        conn.executemany("DELETE FROM resume_fts WHERE rowid = ?", [(row[0],) for row in rows])
+        conn.executemany(
+            "INSERT INTO resume_fts (rowid, resume_text, strengths, weaknesses, missing_elements,"
+            " recommendations, candidate_name) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    return [row[1] for row in rows]
+
+
+def index_resume(resume_id: int, content_hash: str, text, parsed_data: dict):
+    # The index is derived data: a failure here must not fail the analysis request
+    try:
+        return index_resumes([(resume_id, content_hash, text, parsed_data)])[0]
+    except sqlite3.Error:
+        logger.exception("Failed to index resume %s", resume_id)
+        return text
+
+
+def search(query: str, limit: int = 20, offset: int = 0):
+    # FTS5 query syntax: AND / OR / NOT, "exact phrases", prefix*, column:term
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    try:
+        with _connect() as conn:
+            rows = conn.execute(
+                f"SELECT rowid, bm25(resume_fts, {weights}) AS rank,"
+                " snippet(resume_fts, 0, '[', ']', '...', 12) AS snippet"
+                " FROM resume_fts WHERE resume_fts MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (query, limit, offset)
+            ).fetchall()
+    except sqlite3.OperationalError as e:
+        raise SearchQueryError(str(e))
+
+    # bm25() is lower-is-better; flip the sign so higher scores rank first for clients
+    return [{"resume_id": row["rowid"], "score": -row["rank"], "snippet": row["snippet"]} for row in rows]
@@ -0,0 +1,101 @@
+import re
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import ResumeItem, Skill
+
+# ==================== SKILL DICTIONARY ====================
+LIST_KINDS = ("strengths", "weaknesses", "missing_elements", "recommendations")
+SKILL_NAME_MAX_LENGTH = 255
+# Items longer than this are sentences ("Lacks experience with large teams"), not skill terms: they
+# keep their text in resume_items but stay out of the dictionary and the per-skill aggregates
+SKILL_TERM_MAX_WORDS = 4
+SKILL_TERM_MAX_LENGTH = 40
+PREVIEW_MAX_LENGTH = 1000  # Size of the legacy comma-joined ResumeData columns
+
+# Spelling variants that should count as the same skill in aggregates
+SKILL_ALIASES = {
+    "js": "javascript",
+    "java script": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "react.js": "react",
+    "reactjs": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ml": "machine learning",
+    "ci/cd": "ci/cd pipelines",
+    "cicd": "ci/cd pipelines",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t.,;:-*•\"'()"
+_SENTENCE_PUNCTUATION = re.compile(r"[,;:!?]|\.\s")  # "node.js" is a term, "Good. Needs work" is not
+
+
+def canonical_skill(term: str) -> str:
+    name = _WHITESPACE.sub(" ", term.lower()).strip(_EDGE_PUNCTUATION)
+    name = SKILL_ALIASES.get(name, name)
+    return name[:SKILL_NAME_MAX_LENGTH]
+
+
+def skill_term(text: str):
+    # The dictionary name for a short, term-like item ("Kubernetes", "CI/CD", "machine learning"), else None
+    name = canonical_skill(text)
+    if not name or len(name) > SKILL_TERM_MAX_LENGTH or len(name.split(" ")) > SKILL_TERM_MAX_WORDS:
+        return None
+    if _SENTENCE_PUNCTUATION.search(name):
+        return None
+    return name
+
+
+def joined_preview(items: list) -> str:
+    return ", ".join(items)[:PREVIEW_MAX_LENGTH]
+
+
+# ==================== BULK WRITES ====================
+def _skill_ids(db: Session, names: set) -> dict:
+    # One SELECT for known skills, one multi-row INSERT for new ones; concurrent writers
+    # inserting the same new skill are absorbed by INSERT IGNORE / OR IGNORE. skills.name compares
+    # exactly (binary collation on MySQL), so the rows read back are keyed by the canonical names asked for
+    ids = dict(db.execute(select(Skill.name, Skill.id).where(Skill.name.in_(names))).all())
+    missing = names - ids.keys()
+    if missing:
+        db.execute(
+            insert(Skill).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"),
+            [{"name": name} for name in missing]
+        )
+        ids.update(db.execute(select(Skill.name, Skill.id).where(Skill.name.in_(missing))).all())
+    return ids
+
+
+def store_resume_items(db: Session, entries):
+    # entries: iterable of (resume_id, parsed_data). Adds the rows in the caller's transaction.
+    # Every item is stored; only term-like ones are linked to a skill.
+    rows = []
+    terms = []
+    for resume_id, parsed_data in entries:
+        for kind in LIST_KINDS:
+            for position, text in enumerate(parsed_data.get(kind) or []):
+                if text and canonical_skill(text):
+                    rows.append({"resume_id": resume_id, "kind": kind, "position": position, "text": text})
+                    terms.append(skill_term(text))
+    if not rows:
+        return
+
+    names = {term for term in terms if term is not None}
+    skill_ids = _skill_ids(db, names) if names else {}
+    for row, term in zip(rows, terms):
+        row["skill_id"] = skill_ids.get(term)
+    db.execute(insert(ResumeItem), rows)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from database import engine
+from analysis_jobs import get_job_queue, run_job_heartbeat
+from analytics import run_compactor
+from llm_client import get_llm_client
+from quota import local_counter, refund_user_attempts, QUOTA_MODE
+from routes.report_routes import run_report_sweeper
+from search_index import init_search_index
+
+# ==================== STARTUP CONFIGURATION ====================
+# The worker starts serving immediately; the database and LLM are checked in the background and
+# /health/ready reports 503 until both are usable. The schema is managed by Alembic only.
+# The retry delays apply to the LLM warm-up as well
+STARTUP_DB_RETRY_SECONDS = float(os.getenv("STARTUP_DB_RETRY_SECONDS", 1))
+STARTUP_DB_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_DB_RETRY_MAX_SECONDS", 30))
+STARTUP_WARM_LLM = os.getenv("STARTUP_WARM_LLM", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+startup_state = {"database": False, "llm": False, "numpy": False, "jobs_resumed": False}
+
+
+def check_database():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def _retry_with_backoff(name: str, check):
+    # Retries with exponential backoff instead of failing the worker when a dependency is briefly away
+    delay = STARTUP_DB_RETRY_SECONDS
+    while True:
+        try:
+            await run_in_threadpool(check)
+            startup_state[name] = True
+            return
+        except Exception as e:
+            logger.warning("%s not usable yet (%s); retrying in %.1fs", name, e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STARTUP_DB_RETRY_MAX_SECONDS)
+
+
+async def wait_for_database():
+    await _retry_with_backoff("database", check_database)
+
+
+async def warm_up_llm():
+    if not STARTUP_WARM_LLM:
+        startup_state["llm"] = True
+        return
+    # A failed warm-up is retried too, otherwise one hiccup would keep /health/ready at 503 for good
+    await _retry_with_backoff("llm", get_llm_client().warm_up)
+
+
+def load_numpy():
+    # Loaded here rather than on the first request so worker threads do not race to import it
+    from vector_index import np
+
+    np.load()
+    startup_state["numpy"] = True
+
+
+async def _warm_up_step(name: str, step, *args) -> bool:
+    # Each step fails on its own and is logged; startup_state keeps /health/ready at 503 meanwhile
+    try:
+        await run_in_threadpool(step, *args)
+        return True
+    except Exception:
+        logger.exception("Start-up step %s failed", name)
+        return False
+
+
+async def warm_up():
+    # Runs after the worker is already accepting requests
+    # The LLM warm-up may keep retrying for a while, so resuming jobs does not wait for it
+    llm = asyncio.create_task(warm_up_llm())
+    try:
+        await asyncio.gather(wait_for_database(), _warm_up_step("numpy", load_numpy))
+        # Jobs left pending by the previous process need the database, so they resume last
+        # On failure the job heartbeat retries the resume on its next interval
+        if await _warm_up_step("resume_jobs", get_job_queue().resume_pending, job_refund_hook()):
+            startup_state["jobs_resumed"] = True
+        await llm
+    finally:
+        llm.cancel()
+
+
+def job_refund_hook():
+    # Resumed jobs finish on executor threads; their refunds have to run back on this event loop
+    loop = asyncio.get_running_loop()
+
+    def refund(user_id: int):
+        asyncio.run_coroutine_threadsafe(refund_user_attempts(user_id), loop)
+
+    return refund
+
+
+@asynccontextmanager
+async def lifespan(app):
+    init_search_index()
+    tasks = [asyncio.create_task(warm_up()), asyncio.create_task(run_compactor()),
+             asyncio.create_task(run_report_sweeper()),
+             asyncio.create_task(run_job_heartbeat(job_refund_hook()))]
+    if QUOTA_MODE == "local":
+        tasks.append(asyncio.create_task(local_counter.run_flusher()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if QUOTA_MODE == "local":
+        await local_counter.flush()
+
+    from pdf_extraction import shutdown_pool as shutdown_pdf_pool
+    from password_hashing import shutdown_hashing_pool
+    from report_rendering import shutdown_render_pool
+
+    get_job_queue().shutdown()
+    shutdown_pdf_pool()
+    shutdown_hashing_pool()
+    shutdown_render_pool()
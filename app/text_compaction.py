@@ -0,0 +1,115 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+
+from llm_client import estimate_tokens
+
+# ==================== COMPACTION CONFIGURATION ====================
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 3000))
+PAGE_SEPARATOR = "\f"
+
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+INLINE_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+BOILERPLATE_RE = re.compile(
+    r"^(curriculum vitae|resume|r[ée]sum[ée]|cv|references (are )?available (up)?on request\.?"
+    r"|i hereby declare.*|all the information .* true .*|confidential)$",
+    re.IGNORECASE
+)
+
+# Lower number = kept first when the text has to be truncated to the budget
+SECTION_PRIORITIES = {
+    "header": 0,
+    "skills": 1, "technical skills": 1, "core competencies": 1,
+    "experience": 1, "work experience": 1, "professional experience": 1, "employment history": 1,
+    "summary": 2, "profile": 2, "objective": 2, "professional summary": 2,
+    "projects": 3, "education": 3,
+    "certifications": 4, "achievements": 4, "awards": 4, "publications": 4,
+    "languages": 6, "interests": 8, "hobbies": 8,
+    "references": 9, "declaration": 9, "personal details": 9,
+}
+DEFAULT_SECTION_PRIORITY = 5
+
+
+def _normalize_line(line: str) -> str:
+    return INLINE_SPACE_RE.sub(" ", line).strip()
+
+
+def _section_name(line: str):
+    name = line.strip(" :-").lower()
+    return name if name in SECTION_PRIORITIES else None
+
+
+def _split_sections(lines: list):
+    sections = [["header", []]]
+    for line in lines:
+        name = _section_name(line)
+        if name is not None:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _fit_to_budget(sections: list, token_budget: int):
+    order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITIES.get(sections[i][0], DEFAULT_SECTION_PRIORITY))
+    kept = {}
+    remaining = token_budget
+    for index in order:
+        kept_lines = []
+        for line in sections[index][1]:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                break
+            kept_lines.append(line)
+            remaining -= cost
+        kept[index] = kept_lines
+        if remaining <= 0:
+            break
+    # Sections go back into their original order
+    return [line for index in range(len(sections)) for line in kept.get(index, [])]
+
+
+def compact_resume_text(text: str, token_budget: int = PROMPT_TOKEN_BUDGET):
+    # Returns (compacted_text, report) where report holds the token counts before and after
+    tokens_before = estimate_tokens(text)
+    pages = [
+        [_normalize_line(line) for line in unicodedata.normalize("NFKC", page).splitlines()]
+        for page in text.split(PAGE_SEPARATOR)
+    ]
+    pages = [[line for line in page if line] for page in pages]
+
+    # Lines printed on most pages are running headers/footers
+    repeated = set()
+    if len(pages) > 1:
+        page_counts = Counter(line for page in pages for line in set(page))
+        threshold = max(2, len(pages) // 2 + 1)
+        repeated = {line for line, count in page_counts.items() if count >= threshold}
+
+    lines = []
+    seen = set()
+    for page in pages:
+        for line in page:
+            if PAGE_NUMBER_RE.match(line) or BOILERPLATE_RE.match(line):
+                continue
+            # Short lines such as job titles legitimately repeat, so only headers and long lines are deduped
+            key = line.lower()
+            if key in seen and (line in repeated or len(line) > 40):
+                continue
+            seen.add(key)
+            lines.append(line)
+
+    sections = _split_sections(lines)
+    compacted_lines = lines
+    if sum(estimate_tokens(line) + 1 for line in lines) > token_budget:
+        compacted_lines = _fit_to_budget(sections, token_budget)
+
+    compacted = "\n".join(compacted_lines)
+    tokens_after = estimate_tokens(compacted)
+    report = {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "truncated": compacted_lines is not lines,
+    }
+    return compacted, report
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+# ==================== VECTOR INDEX CONFIGURATION ====================
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "vector_index"))
+EMBEDDER = os.getenv("EMBEDDER", "hashing")  # "hashing", "sentence-transformers" or "fake"
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 512))
+SENTENCE_TRANSFORMER_MODEL = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
+VECTOR_ANN_ENABLED = os.getenv("VECTOR_ANN_ENABLED", "false").lower() == "true"
+VECTOR_ANN_TABLES = int(os.getenv("VECTOR_ANN_TABLES", 8))
+VECTOR_ANN_BITS = int(os.getenv("VECTOR_ANN_BITS", 12))
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== EMBEDDERS ====================
+class HashingEmbedder:
+    # Dependency-free CPU embedder: signed feature hashing of unigrams and bigrams, L2-normalized
+    name = "hashing"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str):
+        tokens = TOKEN_RE.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if (digest >> 63) else -1.0
+        # Sublinear term frequency so one repeated keyword cannot dominate the vector
+        return _normalize(np.sign(vectors) * np.log1p(np.abs(vectors)))
+
+
+class SentenceTransformerEmbedder:
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = SENTENCE_TRANSFORMER_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list) -> np.ndarray:
+        return _normalize(np.asarray(self.model.encode(texts, batch_size=32), dtype=np.float32))
+
+
+class FakeEmbedder:
+    # Deterministic pseudo-random vectors per text, for tests
+    name = "fake"
+
+    def __init__(self, dim: int = 32):
+        self.dim = dim
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.vstack([
+            np.random.default_rng(int(hashlib.sha256(text.encode()).hexdigest()[:16], 16)).standard_normal(self.dim)
+            for text in texts
+        ]) if texts else np.zeros((0, self.dim))
+        return _normalize(vectors.astype(np.float32))
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "sentence-transformers": SentenceTransformerEmbedder,
+    "fake": FakeEmbedder,
+}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# ==================== INDEX ====================
+class VectorIndex:
+    # Append-only float32 matrix on disk, read through np.memmap. Row i belongs to ids[i].
+    def __init__(self, directory: Path, embedder, ann_enabled: bool = VECTOR_ANN_ENABLED):
+        self.directory = Path(directory)
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.ids_path = self.directory / "ids.i64"
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._ids = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._check_meta()
+
+        self.ann_enabled = ann_enabled
+        if ann_enabled:
+            rng = np.random.default_rng(0)
+            self._planes = rng.standard_normal((VECTOR_ANN_TABLES, VECTOR_ANN_BITS, self.dim)).astype(np.float32)
+            self._buckets = [dict() for _ in range(VECTOR_ANN_TABLES)]
+            self._bucketed = 0
+
+    def _check_meta(self):
+        meta_path = self.directory / "meta.json"
+        meta = {"embedder": self.embedder.name, "dim": self.dim}
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())
+            if stored != meta:
+                raise ValueError(f"Vector index at {self.directory} was built with {stored}, not {meta}")
+        else:
+            meta_path.write_text(json.dumps(meta))
+
+    def __len__(self):
+        return self.ids_path.stat().st_size // 8 if self.ids_path.exists() else 0
+
+    def add(self, resume_ids: list, texts: list):
+        if not resume_ids:
+            return
+        vectors = self.embedder.embed(texts).astype(np.float32)
+        with self._lock, open(self.directory / "append.lock", "w") as lock_file:
+            # The file lock keeps the two appends paired when several workers share the index
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Vectors first, then ids: a reader never sees an id without its vector
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.asarray(resume_ids, dtype=np.int64).tobytes())
+            self._matrix = None
+
+    def _load(self):
+        with self._lock:
+            if self._matrix is None or len(self._ids) != len(self):
+                count = len(self)
+                if count == 0:
+                    return np.zeros((0, self.dim), dtype=np.float32), np.zeros(0, dtype=np.int64)
+                self._ids = np.fromfile(self.ids_path, dtype=np.int64, count=count)
+                self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+            if self.ann_enabled:
+                self._update_buckets()
+            return self._matrix, self._ids
+
+    def _signatures(self, vectors: np.ndarray) -> np.ndarray:
+        # (tables, n) integer bucket keys from random-hyperplane sign bits
+        bits = np.einsum("tbd,nd->tnb", self._planes, vectors) > 0
+        return bits.dot(1 << np.arange(VECTOR_ANN_BITS))
+
+    def _update_buckets(self):
+        # Only rows appended since the last search are hashed; nothing is rebuilt
+        if self._bucketed >= len(self._ids):
+            return
+        new_rows = np.arange(self._bucketed, len(self._ids))
+        signatures = self._signatures(np.asarray(self._matrix[self._bucketed:]))
+        for table, keys in zip(self._buckets, signatures):
+            for row, key in zip(new_rows, keys):
+                table.setdefault(int(key), []).append(row)
+        self._bucketed = len(self._ids)
+
+    def search(self, text: str, top_k: int = 10):
+        matrix, ids = self._load()
+        if len(ids) == 0:
+            return []
+        query = self.embedder.embed([text])[0].astype(np.float32)
+
+        rows = None
+        if self.ann_enabled:
+            candidates = set()
+            for table, key in zip(self._buckets, self._signatures(query[None, :])[:, 0]):
+                candidates.update(table.get(int(key), []))
+            if len(candidates) >= top_k:
+                rows = np.fromiter(candidates, dtype=np.int64)
+
+        if rows is None:
+            scores = matrix @ query
+            rows = np.arange(len(ids))
+        else:
+            scores = np.asarray(matrix[rows]) @ query
+
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [{"resume_id": int(ids[rows[i]]), "similarity": round(float(scores[i]), 4)} for i in best]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(VECTOR_INDEX_DIR, EMBEDDERS[EMBEDDER]())
+        return _index
+
+
+def embedding_text(text, parsed_data: dict) -> str:
+    # Falls back to the analysis lists when no extracted text is available
+    if text:
+        return text
+    return " ".join(" ".join(parsed_data.get(field, [])) for field in ("strengths", "missing_elements", "recommendations"))
+
+
+def add_resume_embeddings(resume_ids: list, texts: list):
+    # Derived data like the search index: failures are logged, never raised into the request
+    try:
+        get_vector_index().add(resume_ids, texts)
+    except Exception:
+        logger.exception("Failed to embed resumes %s", resume_ids)